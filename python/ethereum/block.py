@@ -3,6 +3,7 @@ from decimal import Decimal
 from typing import Any, Dict
 
 from potpourri.python.ethereum.constants import BYZANTIUM, CONSTANTINOPLE
+from potpourri.python.ethereum.units import wei_to_eth
 
 
 def get_base_reward(num: int) -> int:
@@ -24,7 +25,8 @@ class BaseBlock:
     def __init__(self, data: Dict[str, str]):
         self._data: Dict[str, Any] = data
 
-        self._base_fee_per_gas_hex = data["baseFeePerGas"]
+        # blocks before LONDON have no base fee
+        self._base_fee_per_gas_hex = data.get("baseFeePerGas", "0x0")
         self._base_fee_per_gas: int = int(self._base_fee_per_gas_hex, 16)
 
         self._difficulty_hex = data["difficulty"]
@@ -58,6 +60,14 @@ class BaseBlock:
     def number(self) -> int:
         return self._number
 
+    @property
+    def timestamp(self) -> int:
+        return self._timestamp
+
+    @property
+    def miner(self) -> str:
+        return self._miner
+
     @property
     def base_issuance(self) -> int:
         return get_base_reward(self._number)
@@ -72,7 +82,7 @@ class BaseBlock:
 
     @property
     def base_issuance_eth(self) -> int:
-        return Decimal(self.base_issuance) / Decimal(10**18)
+        return wei_to_eth(self.base_issuance)
 
     @property
     def json(self) -> Dict[str, Any]:
@@ -80,9 +90,8 @@ class BaseBlock:
 
     @property
     def burned_eth(self) -> Decimal:
-        burnt_wei = Decimal(self._gas_used) * Decimal(self._base_fee_per_gas)
-        burnt_eth = burnt_wei / Decimal(10**18)
-        return burnt_eth
+        burnt_wei = self._gas_used * self._base_fee_per_gas
+        return wei_to_eth(burnt_wei)
 
     @property
     def timestamp_dt(self) -> datetime:
@@ -107,7 +116,8 @@ class Block(BaseBlock):
 
     def __init__(self, data: Dict[str, str]):
         super().__init__(data)
-        self._total_difficulty = data["totalDifficulty"]
+        # not returned by every node since the merge
+        self._total_difficulty = data.get("totalDifficulty")
 
 
 class UncleBlock(BaseBlock):
@@ -127,5 +137,5 @@ class UncleBlock(BaseBlock):
             return 0
 
         base_reward = get_base_reward(self.mined_block_num)
-        diff = Decimal(self._number + 8 - self.mined_block_num)
-        return Decimal(base_reward / 8) * diff
+        diff = self._number + 8 - self.mined_block_num
+        return Decimal(base_reward * diff // 8)
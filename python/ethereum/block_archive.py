@@ -0,0 +1,245 @@
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from potpourri.python.ethereum.block import BaseBlock
+
+MAGIC = b"BLKARCH1"
+
+# magic, number of the first block
+HEADER = struct.Struct("<8sQ")
+
+# one fixed-width record per block; logsBloom lives in the side file at (offset, length)
+RECORD = struct.Struct(
+    "<"
+    "Q"  # number
+    "Q"  # timestamp
+    "Q"  # gasLimit
+    "Q"  # gasUsed
+    "Q"  # baseFeePerGas
+    "Q"  # size
+    "32s"  # difficulty, big-endian
+    "32s"  # hash
+    "32s"  # parentHash
+    "32s"  # mixHash
+    "32s"  # receiptsRoot
+    "32s"  # sha3Uncles
+    "32s"  # stateRoot
+    "20s"  # miner
+    "8s"  # nonce
+    "Q"  # logsBloom offset
+    "I"  # logsBloom length
+)
+
+RecordTuple = Tuple[Any, ...]
+
+
+def _hex_bytes(value: str, size: int) -> bytes:
+    return bytes.fromhex(value[2:]).rjust(size, b"\0")
+
+
+def _encode(data: Dict[str, Any], bloom_offset: int, bloom_length: int) -> bytes:
+    return RECORD.pack(
+        int(data["number"], 16),
+        int(data["timestamp"], 16),
+        int(data["gasLimit"], 16),
+        int(data["gasUsed"], 16),
+        int(data.get("baseFeePerGas", "0x0"), 16),
+        int(data["size"], 16),
+        int(data["difficulty"], 16).to_bytes(32, "big"),
+        _hex_bytes(data["hash"], 32),
+        _hex_bytes(data["parentHash"], 32),
+        _hex_bytes(data["mixHash"], 32),
+        _hex_bytes(data["receiptsRoot"], 32),
+        _hex_bytes(data["sha3Uncles"], 32),
+        _hex_bytes(data["stateRoot"], 32),
+        _hex_bytes(data["miner"], 20),
+        _hex_bytes(data["nonce"], 8),
+        bloom_offset,
+        bloom_length,
+    )
+
+
+def _decode(record: RecordTuple, logs_bloom: bytes) -> Dict[str, str]:
+    (
+        number,
+        timestamp,
+        gas_limit,
+        gas_used,
+        base_fee_per_gas,
+        size,
+        difficulty,
+        hash_,
+        parent_hash,
+        mix_hash,
+        receipts_root,
+        sha3_uncles,
+        state_root,
+        miner,
+        nonce,
+        _,
+        _,
+    ) = record
+    return {
+        "baseFeePerGas": hex(base_fee_per_gas),
+        "difficulty": hex(int.from_bytes(difficulty, "big")),
+        "gasLimit": hex(gas_limit),
+        "gasUsed": hex(gas_used),
+        "hash": "0x" + hash_.hex(),
+        "logsBloom": "0x" + logs_bloom.hex(),
+        "miner": "0x" + miner.hex(),
+        "mixHash": "0x" + mix_hash.hex(),
+        "nonce": "0x" + nonce.hex(),
+        "number": hex(number),
+        "parentHash": "0x" + parent_hash.hex(),
+        "receiptsRoot": "0x" + receipts_root.hex(),
+        "sha3Uncles": "0x" + sha3_uncles.hex(),
+        "size": hex(size),
+        "stateRoot": "0x" + state_root.hex(),
+        "timestamp": hex(timestamp),
+    }
+
+
+class BlockArchiveWriter:
+    """
+    Appends blocks to a binary archive: `<path>` holds a header and one fixed-width record per block, and
+    `<path>.extra` holds the variable-length fields. Blocks must be appended with consecutive numbers. Opening an
+    existing archive continues after its last whole block, dropping anything a crash left half written.
+    """
+
+    def __init__(self, path: str):
+        self._records = open(path, "ab+")
+        self._extra = open(f"{path}.extra", "ab")
+
+        self._next_number: Optional[int] = None
+        size = os.path.getsize(path)
+        if size < HEADER.size:
+            # nothing, or a header cut short before the first block was written
+            self._truncate(0, 0)
+        else:
+            self._records.seek(0)
+            magic, first_number = HEADER.unpack(self._records.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a block archive: {path}")
+            count = (size - HEADER.size) // RECORD.size
+            # either file may have reached the disk further than the other, so keep the blocks both hold in full
+            actual_extra_size = os.path.getsize(f"{path}.extra")
+            extra_size = 0
+            while count > 0:
+                self._records.seek(HEADER.size + (count - 1) * RECORD.size)
+                record = RECORD.unpack(self._records.read(RECORD.size))
+                extra_size = record[-2] + record[-1]
+                if extra_size <= actual_extra_size:
+                    break
+                count -= 1
+                extra_size = 0
+            # appends go to the end of the file, so a torn record must go before anything is written after it
+            self._truncate(HEADER.size + count * RECORD.size, extra_size)
+            self._next_number = first_number + count
+
+    def _truncate(self, records_size: int, extra_size: int) -> None:
+        # only ever shrinks: truncate() pads a file it grows with zeros, which would read back as empty blooms
+        self._records.truncate(records_size)
+        self._extra.truncate(extra_size)
+        self._records.seek(0, os.SEEK_END)
+        self._extra.seek(0, os.SEEK_END)
+
+    def append(self, block: BaseBlock) -> None:
+        data = block.json
+        number = int(data["number"], 16)
+        if self._next_number is None:
+            self._records.write(HEADER.pack(MAGIC, number))
+        elif number != self._next_number:
+            raise ValueError(f"Expected block {self._next_number}. Got: {number}")
+
+        logs_bloom = bytes.fromhex(data["logsBloom"][2:])
+        offset = self._extra.tell()
+        self._extra.write(logs_bloom)
+        self._records.write(_encode(data, offset, len(logs_bloom)))
+        self._next_number = number + 1
+
+    def flush(self) -> None:
+        # the side file first, so after a flush no record points past the end of it. The buffers also flush on
+        # their own as they fill, in no particular order, which reopening the archive recovers from
+        self._extra.flush()
+        self._records.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._extra.close()
+        self._records.close()
+
+    def __enter__(self) -> "BlockArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class BlockArchive:
+    """
+    A read-only, memory-mapped view of an archive written by BlockArchiveWriter.
+
+    Opening an archive maps it without reading it, and records are unpacked straight from the mapping on access,
+    so block N is one offset computation away however large the archive is.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap cannot map an empty file, which is what a writer that never appended leaves
+            self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        with open(f"{path}.extra", "rb") as f:
+            self._extra = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+        self._first_number: int = 0
+        self._count: int = 0
+        if size == 0:
+            return
+        if size < HEADER.size:
+            raise ValueError(f"Truncated block archive header: {path}")
+        magic, self._first_number = HEADER.unpack_from(self._records, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a block archive: {path}")
+        self._count = (len(self._records) - HEADER.size) // RECORD.size
+
+    @property
+    def first_number(self) -> int:
+        return self._first_number
+
+    @property
+    def last_number(self) -> int:
+        return self._first_number + self._count - 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, number: int) -> bool:
+        return self._first_number <= number < self._first_number + self._count
+
+    def record(self, number: int) -> RecordTuple:
+        """Return the raw fields of block `number`, in RECORD order."""
+        if number not in self:
+            raise KeyError(number)
+        return RECORD.unpack_from(self._records, HEADER.size + (number - self._first_number) * RECORD.size)
+
+    def logs_bloom(self, number: int) -> bytes:
+        record = self.record(number)
+        offset, length = record[-2], record[-1]
+        return self._extra[offset : offset + length]
+
+    def __getitem__(self, number: int) -> BaseBlock:
+        record = self.record(number)
+        offset, length = record[-2], record[-1]
+        return BaseBlock(_decode(record, self._extra[offset : offset + length]))
+
+    def __iter__(self) -> Iterator[BaseBlock]:
+        for number in range(self._first_number, self._first_number + self._count):
+            yield self[number]
+
+    def close(self) -> None:
+        if isinstance(self._records, mmap.mmap):
+            self._records.close()
+        if isinstance(self._extra, mmap.mmap):
+            self._extra.close()
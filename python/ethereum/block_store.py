@@ -0,0 +1,173 @@
+import json
+import mmap
+import os
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Sequence, Union
+
+from potpourri.python.ethereum.block import BaseBlock, get_base_reward
+from potpourri.python.ethereum.constants import BYZANTIUM, CONSTANTINOPLE
+
+# name -> array typecode
+COLUMNS: Dict[str, str] = {
+    "number": "Q",
+    "timestamp": "Q",
+    "gas_used": "Q",
+    "base_fee_per_gas": "Q",
+    "miner_index": "I",
+}
+
+MINERS_FILE = "miners.json"
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+Column = Union[array, memoryview]
+
+
+class BlockStore:
+    """
+    A columnar store of the block fields needed for issuance and burn analytics.
+
+    Each column is a typed array, and miners are interned into a shared list. `save` writes every column as a raw
+    file, which `load` maps into memory without parsing, so a store of millions of blocks opens instantly and only
+    the pages that are read are loaded.
+
+    Blocks must be appended in ascending order.
+    """
+
+    def __init__(self):
+        self.number: Column = array(COLUMNS["number"])
+        self.timestamp: Column = array(COLUMNS["timestamp"])
+        self.gas_used: Column = array(COLUMNS["gas_used"])
+        self.base_fee_per_gas: Column = array(COLUMNS["base_fee_per_gas"])
+        self.miner_index: Column = array(COLUMNS["miner_index"])
+
+        self._miners: List[str] = []
+        self._miner_index: Dict[str, int] = {}
+        self._mmaps: List[mmap.mmap] = []
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[BaseBlock]) -> "BlockStore":
+        store = cls()
+        store.extend(blocks)
+        return store
+
+    def append(self, block: BaseBlock) -> None:
+        if self._mmaps:
+            raise ValueError("A store opened with load() is read-only")
+        if len(self.number) and block.number <= self.number[-1]:
+            raise ValueError(f"Blocks must be appended in order: {block.number} after {self.number[-1]}")
+
+        miner = block.miner.lower()
+        index = self._miner_index.get(miner)
+        if index is None:
+            index = len(self._miners)
+            self._miners.append(miner)
+            self._miner_index[miner] = index
+
+        self.number.append(block.number)
+        self.timestamp.append(block.timestamp)
+        self.gas_used.append(block.gas_used)
+        self.base_fee_per_gas.append(block.base_fee_per_gas)
+        self.miner_index.append(index)
+
+    def extend(self, blocks: Iterable[BaseBlock]) -> None:
+        for block in blocks:
+            self.append(block)
+
+    def __len__(self) -> int:
+        return len(self.number)
+
+    @property
+    def miners(self) -> List[str]:
+        return self._miners
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in COLUMNS:
+            with open(os.path.join(directory, f"{name}.bin"), "wb") as f:
+                f.write(getattr(self, name))
+        with open(os.path.join(directory, MINERS_FILE), "w") as f:
+            json.dump(self._miners, f)
+
+    @classmethod
+    def load(cls, directory: str) -> "BlockStore":
+        """Map a saved store into memory. The columns become read-only memoryviews over the files."""
+        store = cls()
+        for name, typecode in COLUMNS.items():
+            with open(os.path.join(directory, f"{name}.bin"), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            store._mmaps.append(mapped)
+            setattr(store, name, memoryview(mapped).cast(typecode))
+
+        with open(os.path.join(directory, MINERS_FILE)) as f:
+            store._miners = json.load(f)
+        store._miner_index = {miner: i for i, miner in enumerate(store._miners)}
+        return store
+
+    def close(self) -> None:
+        for name in COLUMNS:
+            column = getattr(self, name)
+            if isinstance(column, memoryview):
+                column.release()
+        for mapped in self._mmaps:
+            mapped.close()
+        self._mmaps = []
+
+    def burned_wei(self) -> List[int]:
+        return [gas_used * base_fee for gas_used, base_fee in zip(self.gas_used, self.base_fee_per_gas)]
+
+    def issuance_wei(self) -> List[int]:
+        """The base block reward of every block, per get_base_reward."""
+        byzantium_reward = get_base_reward(BYZANTIUM)
+        constantinople_reward = get_base_reward(CONSTANTINOPLE)
+        latest_reward = get_base_reward(CONSTANTINOPLE + 1)
+        return [
+            byzantium_reward if n <= BYZANTIUM else constantinople_reward if n <= CONSTANTINOPLE else latest_reward
+            for n in self.number
+        ]
+
+    def total_burned_wei(self) -> int:
+        return sum(self.burned_wei())
+
+    def total_issuance_wei(self) -> int:
+        # the blocks are sorted, so each reward era is one contiguous slice
+        byzantium_end = bisect_right(self.number, BYZANTIUM)
+        constantinople_end = bisect_right(self.number, CONSTANTINOPLE)
+        return (
+            byzantium_end * get_base_reward(BYZANTIUM)
+            + (constantinople_end - byzantium_end) * get_base_reward(CONSTANTINOPLE)
+            + (len(self.number) - constantinople_end) * get_base_reward(CONSTANTINOPLE + 1)
+        )
+
+    def group_sum(self, values: Sequence[int], period_seconds: int) -> Dict[datetime, int]:
+        """Sum per-block `values` into UTC periods of `period_seconds`, keyed by the start of each period."""
+        totals: Dict[int, int] = defaultdict(int)
+        for timestamp, value in zip(self.timestamp, values):
+            totals[timestamp - timestamp % period_seconds] += value
+        return {datetime.fromtimestamp(start, tz=timezone.utc): total for start, total in sorted(totals.items())}
+
+    def burned_wei_by_day(self) -> Dict[datetime, int]:
+        return self.group_sum(self.burned_wei(), SECONDS_PER_DAY)
+
+    def burned_wei_by_hour(self) -> Dict[datetime, int]:
+        return self.group_sum(self.burned_wei(), SECONDS_PER_HOUR)
+
+    def issuance_wei_by_day(self) -> Dict[datetime, int]:
+        return self.group_sum(self.issuance_wei(), SECONDS_PER_DAY)
+
+    def issuance_wei_by_hour(self) -> Dict[datetime, int]:
+        return self.group_sum(self.issuance_wei(), SECONDS_PER_HOUR)
+
+    def net_issuance_wei_by_day(self) -> Dict[datetime, int]:
+        net = [issued - burned for issued, burned in zip(self.issuance_wei(), self.burned_wei())]
+        return self.group_sum(net, SECONDS_PER_DAY)
+
+    def net_issuance_wei_by_hour(self) -> Dict[datetime, int]:
+        net = [issued - burned for issued, burned in zip(self.issuance_wei(), self.burned_wei())]
+        return self.group_sum(net, SECONDS_PER_HOUR)
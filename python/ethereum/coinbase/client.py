@@ -1,21 +1,40 @@
-import json
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
+from potpourri.python.utils import json_codec
+from potpourri.python.utils.http_session import HttpSession, get_default_session
+
+# the most candles the exchange API returns per request
+MAX_CANDLES = 300
+
+# (start time, close)
+Candle = Tuple[int, Decimal]
+
+
+class CoinbaseNotFoundException(ValueError):
+    """
+    An exception that is raised when Coinbase does not know the requested resource, e.g. an unsupported currency.
+    """
+
+    pass
 
 
 class CoinbaseClient:
-    def __init__(self):
+    def __init__(self, session: Optional[HttpSession] = None):
         self._base_url = "https://api.coinbase.com/v2/"
+        self._exchange_url = "https://api.exchange.coinbase.com/"
+        self._session: HttpSession = session or get_default_session()
 
     def query(self, url) -> Dict[str, Any]:
-        response = requests.get(url)
+        response = self._session.get(url)
 
-        if response.status_code != 200:
+        if response.status_code == 404:
+            raise CoinbaseNotFoundException(f"[{url}] Status Code: {response.status_code}")
+        elif response.status_code != 200:
             raise ValueError(f"[{url}] Status Code: {response.status_code}")
         else:
-            response_json = json.loads(response.content)
+            response_json = json_codec.loads(response.content)
 
         return response_json
 
@@ -25,3 +44,27 @@ class CoinbaseClient:
 
         response: Dict[str, Any] = self.query(url)
         return Decimal(response["data"]["amount"])
+
+    def get_candles(self, ticker: str, start: int, end: int, granularity: int = 3600) -> List[Candle]:
+        """
+        Get the USD candles of a ticker between two unix timestamps, oldest first. At most MAX_CANDLES are returned
+        per call.
+
+        Parameters:
+        ticker (str): The ticker, e.g. "ETH".
+        start (int): The unix timestamp of the first candle.
+        end (int): The unix timestamp of the last candle.
+        granularity (int, optional): The candle width in seconds: 60, 300, 900, 3600, 21600 or 86400.
+            Defaults to 3600.
+
+        Returns:
+        list of (int, Decimal): The start time and close price of each candle.
+        """
+        start_iso = datetime.fromtimestamp(start, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        end_iso = datetime.fromtimestamp(end, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        route: str = f"products/{ticker}-USD/candles?granularity={granularity}&start={start_iso}&end={end_iso}"
+        url = f"{self._exchange_url}{route}"
+
+        # [[time, low, high, open, close, volume], ...], newest first
+        response: List[List[Any]] = self.query(url)
+        return sorted((int(c[0]), Decimal(str(c[4]))) for c in response)
@@ -0,0 +1,142 @@
+import os
+import time
+from array import array
+from bisect import bisect_right
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from potpourri.python.ethereum.coinbase.client import MAX_CANDLES, CoinbaseClient
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.etherscan.erc20 import ERC20Transfer
+from potpourri.python.ethereum.etherscan.transaction import InternalTransaction, Transaction
+
+# ticker -> (candle start times, close prices)
+Series = Tuple[array, List[Decimal]]
+
+
+def event_ticker(event: BaseEvent) -> str:
+    if isinstance(event, (Transaction, InternalTransaction)):
+        return "ETH"
+    return event.token_symbol.upper()
+
+
+def event_amount(event: BaseEvent) -> Decimal:
+    if isinstance(event, (Transaction, InternalTransaction)):
+        return event.value_eth
+    if isinstance(event, ERC20Transfer):
+        return event.value_decimal
+    raise TypeError(f"Unsupported event type: {type(event).__name__}")
+
+
+class PriceHistory:
+    """
+    Locally stored USD candle series per ticker, for valuing events at the time they happened.
+
+    Each series is an append-only `<TICKER>-<granularity>.csv` file of `timestamp,close` lines, extended in bulk
+    from where it stops, and is held in memory as a sorted array of candle start times. Looking up many timestamps
+    sorts them once and walks them alongside the series, an as-of join rather than a lookup per event.
+    """
+
+    def __init__(self, directory: str, client: Optional[CoinbaseClient] = None, granularity: int = 3600):
+        """
+        Constructor for the PriceHistory class.
+
+        Parameters:
+        directory (str): The directory holding the series files.
+        client (CoinbaseClient, optional): The client to fetch candles with. Defaults to a new client.
+        granularity (int, optional): The candle width in seconds. Defaults to 3600.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._directory: str = directory
+        self._client: CoinbaseClient = client or CoinbaseClient()
+        self._granularity: int = granularity
+        self._series: Dict[str, Series] = {}
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self._directory, f"{ticker}-{self._granularity}.csv")
+
+    def series(self, ticker: str) -> Series:
+        ticker = ticker.upper()
+        if ticker not in self._series:
+            timestamps, closes = array("q"), []
+            if os.path.exists(self._path(ticker)):
+                with open(self._path(ticker)) as f:
+                    for line in f:
+                        timestamp, close = line.rstrip("\n").split(",")
+                        timestamps.append(int(timestamp))
+                        closes.append(Decimal(close))
+            self._series[ticker] = (timestamps, closes)
+        return self._series[ticker]
+
+    def extend(self, ticker: str, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """
+        Fetch the candles after the end of the stored series, or from `start` for a new one, up to `end` (default
+        now). Only complete candles are fetched. Returns the number of candles added.
+        """
+        ticker = ticker.upper()
+        timestamps, closes = self.series(ticker)
+        if timestamps:
+            start = timestamps[-1] + self._granularity
+        elif start is None:
+            raise ValueError(f"No stored series for {ticker}, a start timestamp is required")
+        # the candle still in progress would be stored with a close that later trades change, and never corrected
+        last_complete = (int(time.time()) // self._granularity - 1) * self._granularity
+        end = min(end, last_complete) if end is not None else last_complete
+
+        added = 0
+        with open(self._path(ticker), "a") as f:
+            window = MAX_CANDLES * self._granularity
+            for window_start in range(start, end + 1, window):
+                window_end = min(end, window_start + window - self._granularity)
+                for timestamp, close in self._client.get_candles(ticker, window_start, window_end, self._granularity):
+                    if timestamp > end or (timestamps and timestamp <= timestamps[-1]):
+                        continue
+                    timestamps.append(timestamp)
+                    closes.append(close)
+                    f.write(f"{timestamp},{close}\n")
+                    added += 1
+        return added
+
+    def price_at(self, ticker: str, timestamp: int) -> Optional[Decimal]:
+        """
+        The close of the candle containing `timestamp`, or None if there is no such candle: before the series starts,
+        after it ends (call `extend` first), or in a gap where Coinbase had no trades.
+        """
+        timestamps, closes = self.series(ticker)
+        i = bisect_right(timestamps, timestamp) - 1
+        if i < 0 or timestamp >= timestamps[i] + self._granularity:
+            return None
+        return closes[i]
+
+    def prices_at(self, ticker: str, timestamps: Sequence[int]) -> List[Optional[Decimal]]:
+        """`price_at` for many timestamps at once, returned in the order given."""
+        series_timestamps, closes = self.series(ticker)
+        prices: List[Optional[Decimal]] = [None] * len(timestamps)
+
+        j = -1
+        for i in sorted(range(len(timestamps)), key=timestamps.__getitem__):
+            while j + 1 < len(series_timestamps) and series_timestamps[j + 1] <= timestamps[i]:
+                j += 1
+            if j >= 0 and timestamps[i] < series_timestamps[j] + self._granularity:
+                prices[i] = closes[j]
+        return prices
+
+    def usd_values(
+        self, events: Iterable[BaseEvent], ticker: Callable[[BaseEvent], str] = event_ticker
+    ) -> List[Optional[Decimal]]:
+        """
+        Value ETH transactions and ERC20 transfers in USD at their timestamps, in the order given. Events without a
+        stored candle for their ticker at that time, including any newer than the series, are valued as None.
+        """
+        events = list(events)
+        by_ticker: Dict[str, List[int]] = {}
+        for i, event in enumerate(events):
+            by_ticker.setdefault(ticker(event), []).append(i)
+
+        values: List[Optional[Decimal]] = [None] * len(events)
+        for symbol, indices in by_ticker.items():
+            prices = self.prices_at(symbol, [events[i].timestamp for i in indices])
+            for i, price in zip(indices, prices):
+                if price is not None:
+                    values[i] = event_amount(events[i]) * price
+        return values
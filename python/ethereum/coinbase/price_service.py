@@ -0,0 +1,124 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from potpourri.python.ethereum.coinbase.client import CoinbaseClient
+
+
+class PriceService:
+    """
+    Spot prices from Coinbase behind a TTL cache.
+
+    Prices are kept in an in-memory LRU and, optionally, a SQLite file shared between runs. Concurrent callers
+    asking for the same ticker share a single in-flight request, and `get_prices` fetches many tickers in parallel.
+    """
+
+    def __init__(
+        self,
+        client: Optional[CoinbaseClient] = None,
+        ttl: float = 60.0,
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+        max_workers: int = 8,
+    ):
+        """
+        Constructor for the PriceService class.
+
+        Parameters:
+        client (CoinbaseClient, optional): The client to fetch prices with. Defaults to a new client.
+        ttl (float, optional): How long a price is served from cache, in seconds. Defaults to 60.
+        max_entries (int, optional): The size of the in-memory LRU. Defaults to 1024.
+        disk_path (str, optional): A SQLite file to also cache prices in. Defaults to memory only.
+        max_workers (int, optional): The number of concurrent requests in `get_prices`. Defaults to 8.
+        """
+        self._client: CoinbaseClient = client or CoinbaseClient()
+        self._ttl: float = ttl
+        self._max_entries: int = max_entries
+        self._max_workers: int = max_workers
+
+        self._lock = threading.Lock()
+        # ticker -> (fetched at, price)
+        self._cache: "OrderedDict[str, Tuple[float, Decimal]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+
+        self._conn: Optional[sqlite3.Connection] = None
+        if disk_path is not None:
+            self._conn = sqlite3.connect(disk_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS prices (ticker TEXT PRIMARY KEY, price TEXT NOT NULL, fetched_at REAL)"
+            )
+
+    def _get_cached(self, ticker: str) -> Optional[Decimal]:
+        """Look the ticker up in memory, then on disk. Must be called with the lock held."""
+        now = time.time()
+
+        entry = self._cache.get(ticker)
+        if entry is not None and now - entry[0] < self._ttl:
+            self._cache.move_to_end(ticker)
+            return entry[1]
+
+        if self._conn is not None:
+            row = self._conn.execute("SELECT price, fetched_at FROM prices WHERE ticker = ?", (ticker,)).fetchone()
+            if row is not None and now - row[1] < self._ttl:
+                self._put_cached(ticker, Decimal(row[0]), row[1], persist=False)
+                return Decimal(row[0])
+
+        return None
+
+    def _put_cached(self, ticker: str, price: Decimal, fetched_at: float, persist: bool = True) -> None:
+        """Must be called with the lock held."""
+        self._cache[ticker] = (fetched_at, price)
+        self._cache.move_to_end(ticker)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+        if persist and self._conn is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prices (ticker, price, fetched_at) VALUES (?, ?, ?)",
+                (ticker, str(price), fetched_at),
+            )
+            self._conn.commit()
+
+    def get_price(self, ticker: str) -> Decimal:
+        ticker = ticker.upper()
+        with self._lock:
+            price = self._get_cached(ticker)
+            if price is not None:
+                return price
+
+            future = self._in_flight.get(ticker)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[ticker] = future
+
+        if not owner:
+            return future.result()
+
+        try:
+            price = self._client.get_price(ticker)
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[ticker]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._put_cached(ticker, price, time.time())
+            del self._in_flight[ticker]
+        future.set_result(price)
+        return price
+
+    def get_prices(self, tickers: Iterable[str]) -> Dict[str, Decimal]:
+        """Get the prices of many tickers concurrently, keyed by upper-case ticker."""
+        unique = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="prices") as executor:
+            return dict(zip(unique, executor.map(self.get_price, unique)))
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
@@ -0,0 +1,74 @@
+"""
+Batch sums over events, done in exact integer base units with a single Decimal conversion at the end, instead of
+adding up the per-event Decimal properties.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, Tuple, Union
+
+from potpourri.python.ethereum.etherscan.erc20 import ERC20Transfer
+from potpourri.python.ethereum.etherscan.event_table import EventTable
+from potpourri.python.ethereum.etherscan.transaction import InternalTransaction, Transaction
+from potpourri.python.ethereum.units import to_decimal, wei_to_eth
+
+Transactions = Union[Iterable[Transaction], EventTable]
+Transfers = Union[Iterable[ERC20Transfer], EventTable]
+
+
+def sum_fee_wei(transactions: Transactions) -> int:
+    if isinstance(transactions, EventTable):
+        return transactions.total_fee_wei()
+    return sum(t.fee_wei for t in transactions)
+
+
+def sum_fee_eth(transactions: Transactions) -> Decimal:
+    return wei_to_eth(sum_fee_wei(transactions))
+
+
+def sum_value_wei(transactions: Union[Iterable[Union[Transaction, InternalTransaction]], EventTable]) -> int:
+    if isinstance(transactions, EventTable):
+        return sum(transactions.value)
+    return sum(t.value_wei for t in transactions)
+
+
+def sum_value_eth(transactions: Union[Iterable[Union[Transaction, InternalTransaction]], EventTable]) -> Decimal:
+    return wei_to_eth(sum_value_wei(transactions))
+
+
+def sum_fee_wei_by_address(transactions: Transactions) -> Dict[str, int]:
+    """Total fees paid by each sender."""
+    totals: Dict[str, int] = defaultdict(int)
+    if isinstance(transactions, EventTable):
+        addresses = transactions.addresses
+        for from_index, fee in zip(transactions.from_index, transactions.fee_wei):
+            totals[addresses[from_index]] += fee
+    else:
+        for t in transactions:
+            totals[t.from_address.lower()] += t.fee_wei
+    return dict(totals)
+
+
+def sum_token_units(transfers: Transfers) -> Dict[str, Tuple[int, int]]:
+    """Total raw token units moved per contract, with the token's decimals: {contract: (units, decimals)}."""
+    totals: Dict[str, int] = defaultdict(int)
+    decimals: Dict[str, int] = {}
+    if isinstance(transfers, EventTable):
+        addresses = transfers.addresses
+        for contract_index, value, token_decimal in zip(
+            transfers.contract_index, transfers.value, transfers.token_decimal
+        ):
+            contract = addresses[contract_index]
+            totals[contract] += value
+            decimals[contract] = token_decimal
+    else:
+        for t in transfers:
+            contract = (t.contract_address or "").lower()
+            totals[contract] += t.value
+            decimals[contract] = t.token_decimal
+    return {contract: (units, decimals[contract]) for contract, units in totals.items()}
+
+
+def sum_token_values(transfers: Transfers) -> Dict[str, Decimal]:
+    """Total amount moved per token contract, in whole tokens."""
+    return {contract: to_decimal(units, decimals) for contract, (units, decimals) in sum_token_units(transfers).items()}
@@ -0,0 +1,193 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from potpourri.python.ethereum.etherscan.client import EtherscanClient
+from potpourri.python.ethereum.etherscan.compact import CompactBaseEvent
+from potpourri.python.ethereum.etherscan.erc20 import ERC20Transfer
+from potpourri.python.ethereum.etherscan.erc721 import ERC721Transfer
+from potpourri.python.ethereum.etherscan.erc1155 import ERC1155Transfer
+from potpourri.python.ethereum.etherscan.event_table import EventTable
+from potpourri.python.ethereum.etherscan.rate_limit import RateLimiter, get_rate_limiter
+from potpourri.python.ethereum.etherscan.transaction import InternalTransaction, Transaction
+from potpourri.python.utils.http_session import HttpSession
+
+T = TypeVar("T")
+
+
+class AsyncEtherscanClient:
+    """
+    An asyncio front-end for EtherscanClient.
+
+    Requests run on a pool of `max_concurrency` workers sharing one keep-alive HttpSession, so fanning out over many
+    addresses is bounded by the API rate limit rather than round-trip latency. Each call waits for its rate-limit
+    token on the event loop before it is handed to a worker, so waiting never ties up a worker thread. Results are
+    the same Transaction/ERC20Transfer/... objects returned by EtherscanClient.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 5,
+        session: Optional[HttpSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """
+        Constructor for the AsyncEtherscanClient class.
+
+        Parameters:
+        api_key (str): The Etherscan API key.
+        max_concurrency (int, optional): The maximum number of requests in flight. Defaults to 5.
+        session (HttpSession, optional): The session to send requests with. Defaults to a new session with one
+            pooled connection per concurrent request. A session passed in is left open by `close`.
+        rate_limiter (RateLimiter, optional): The limiter pacing the calls. Defaults to the one shared by every
+            client using `api_key`.
+        """
+        self._owns_session: bool = session is None
+        self._session: HttpSession = session or HttpSession(pool_maxsize=max_concurrency)
+        self._rate_limiter: RateLimiter = rate_limiter or get_rate_limiter(api_key)
+        self._client = EtherscanClient(api_key, session=self._session, rate_limiter=self._rate_limiter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="etherscan")
+
+    @property
+    def client(self) -> EtherscanClient:
+        return self._client
+
+    def _call_prepaid(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._rate_limiter.prepaid():
+            return fn(*args, **kwargs)
+
+    async def _run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        await self._rate_limiter.acquire_async()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self._call_prepaid, fn, *args, **kwargs))
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self._owns_session:
+            self._session.close()
+
+    async def __aenter__(self) -> "AsyncEtherscanClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def fan_out(
+        self,
+        method: Callable[..., Awaitable[T]],
+        addresses: Iterable[str],
+        **kwargs: Any,
+    ) -> Dict[str, T]:
+        """
+        Call one of the get_* methods for every address concurrently.
+
+        Parameters:
+        method (callable): A get_* method of this client, e.g. `client.get_txlist`.
+        addresses (iterable of str): The addresses to query.
+        **kwargs: Extra arguments passed to every call.
+
+        Returns:
+        dict: The result for each address, in input order.
+        """
+        addresses = list(addresses)
+        results: List[T] = await asyncio.gather(*[method(address, **kwargs) for address in addresses])
+        return dict(zip(addresses, results))
+
+    async def get_block_number(self) -> int:
+        return await self._run(self._client.get_block_number)
+
+    async def get_account_balance(self, address: str) -> Decimal:
+        return await self._run(self._client.get_account_balance, address)
+
+    async def get_account_balances(self, addresses: Iterable[str], max_workers: int = 4) -> Dict[str, Decimal]:
+        return await self._run(self._client.get_account_balances, addresses, max_workers)
+
+    async def get_txlist(
+        self,
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[Transaction]:
+        return await self._run(self._client.get_txlist, address, start_block, end_block, page, offset)
+
+    async def get_txlistinternal(
+        self,
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[InternalTransaction]:
+        return await self._run(self._client.get_txlistinternal, address, start_block, end_block, page, offset)
+
+    async def get_tokentx(
+        self,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[ERC20Transfer]:
+        return await self._run(
+            self._client.get_tokentx, address, contract_address, start_block, end_block, page, offset
+        )
+
+    async def get_tokennfttx(
+        self,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[ERC721Transfer]:
+        return await self._run(
+            self._client.get_tokennfttx, address, contract_address, start_block, end_block, page, offset
+        )
+
+    async def get_token1155tx(
+        self,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[ERC1155Transfer]:
+        return await self._run(
+            self._client.get_token1155tx, address, contract_address, start_block, end_block, page, offset
+        )
+
+    async def get_event_table(
+        self,
+        action: str,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> EventTable:
+        return await self._run(
+            self._client.get_event_table, action, address, contract_address, start_block, end_block, page, offset
+        )
+
+    async def get_compact_events(
+        self,
+        action: str,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[CompactBaseEvent]:
+        return await self._run(
+            self._client.get_compact_events, action, address, contract_address, start_block, end_block, page, offset
+        )
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+
+"""
+Time turning a txlist or tokentx page into events: decoding dicts with the standard library or utils.json_codec and
+then converting fields, against decoding straight into the typed rows of etherscan.schema.
+
+The page is built from the fixture of the action in fixtures/, repeated up to -n rows. Pass --fixture with a
+recorded Etherscan response (optionally gzipped) to time that instead.
+"""
+
+import gzip
+import json
+import os
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.etherscan.compact import CompactBaseEvent, CompactERC20Transfer, CompactTransaction
+from potpourri.python.ethereum.etherscan.erc20 import ERC20Transfer
+from potpourri.python.ethereum.etherscan.event_table import EventTable
+from potpourri.python.ethereum.etherscan.transaction import Transaction
+from potpourri.python.utils import json_codec
+
+try:
+    from potpourri.python.ethereum.etherscan import schema
+except ImportError:
+    schema = None
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# action -> (eager event class, compact event class)
+EVENT_TYPES: Dict[str, Tuple[Type[BaseEvent], Type[CompactBaseEvent]]] = {
+    "txlist": (Transaction, CompactTransaction),
+    "tokentx": (ERC20Transfer, CompactERC20Transfer),
+}
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def read_fixture(path: str) -> bytes:
+    with open(path, "rb") as f:
+        content: bytes = f.read()
+    return gzip.decompress(content) if path.endswith(".gz") else content
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("--action", choices=sorted(EVENT_TYPES), default="txlist", help="The kind of page")
+    parser.add_argument("--fixture", type=str, help="Path to a recorded response, used as is")
+    parser.add_argument("-n", type=int, default=10000, help="Rows in the page built from the checked-in fixture")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per case, the best one is reported")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: Namespace = parse_args()
+    event_type, compact_type = EVENT_TYPES[args.action]
+
+    if args.fixture is not None:
+        content: bytes = read_fixture(args.fixture)
+    else:
+        page: Dict[str, Any] = json.loads(read_fixture(os.path.join(FIXTURES, f"{args.action}.json.gz")))
+        fixture_rows: List[Dict[str, str]] = page["result"]
+        page["result"] = [fixture_rows[i % len(fixture_rows)] for i in range(args.n)]
+        content = json.dumps(page).encode("utf-8")
+
+    n_rows = len(json.loads(content)["result"])
+    print(f"{args.action}: {n_rows} rows, {len(content) / 2**20:.1f} MiB, fast decoder: {json_codec.DECODER}")
+
+    def compact_events(response: Dict[str, Any]) -> List[CompactBaseEvent]:
+        return [compact_type.from_struct(row) for row in response["result"]]
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "json.loads": lambda: json.loads(content),
+        "json_codec.loads": lambda: json_codec.loads(content),
+        f"json.loads + {event_type.__name__}": lambda: [event_type(t) for t in json.loads(content)["result"]],
+        f"json_codec.loads + {event_type.__name__}": lambda: [
+            event_type(t) for t in json_codec.loads(content)["result"]
+        ],
+        "json.loads + EventTable": lambda: EventTable.from_response(json.loads(content)),
+        "json_codec.loads + EventTable": lambda: EventTable.from_response(json_codec.loads(content)),
+    }
+    if schema is not None:
+        cases.update(
+            {
+                "schema.decode_page": lambda: schema.decode_page(args.action, content),
+                "schema.decode_page + EventTable": lambda: EventTable.from_response(
+                    schema.decode_page(args.action, content)
+                ),
+                f"schema.decode_page + {compact_type.__name__}": lambda: compact_events(
+                    schema.decode_page(args.action, content)
+                ),
+            }
+        )
+    else:
+        print("msgspec is not installed, skipping the typed schema cases")
+
+    for name, fn in cases.items():
+        print(f"{name:<48} {best_of(fn, args.repeat) * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
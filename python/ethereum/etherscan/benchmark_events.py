@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+"""
+Measure construction time and resident memory of the eager event classes against the compact __slots__ ones.
+
+Each mode runs in a fresh subprocess so the RSS numbers do not include the other modes' garbage.
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Callable, Dict, Iterator
+
+from potpourri.python.ethereum.etherscan.compact import CompactTransaction
+from potpourri.python.ethereum.etherscan.transaction import Transaction
+
+MODES: Dict[str, Callable[[Dict[str, str]], object]] = {
+    "eager": Transaction,
+    "compact": CompactTransaction,
+    "compact+json": lambda data: CompactTransaction(data, keep_json=True),
+}
+
+TEMPLATE = {
+    "blockNumber": "14923678",
+    "timeStamp": "1654646411",
+    "hash": "",
+    "nonce": "6",
+    "blockHash": "0x7e1638fd2c6bdd05ffd83c1cf06c63e2f67d0f802084bef076d06bdcf86d1bb0",
+    "transactionIndex": "61",
+    "from": "0x9aa99c23f67c81701c772b106b4f83f6e858dd2e",
+    "to": "0xc5102fe9359fd9a28f877a67e36b0f050d81a3cc",
+    "value": "1000000000000000000",
+    "gas": "21000",
+    "gasPrice": "33924816895",
+    "isError": "0",
+    "txreceipt_status": "1",
+    "input": "0x",
+    "contractAddress": "",
+    "cumulativeGasUsed": "4683926",
+    "gasUsed": "21000",
+    "confirmations": "2399214",
+    "methodId": "0x",
+    "functionName": "",
+}
+
+
+def rows(n: int) -> Iterator[Dict[str, str]]:
+    """Yield fresh dicts, like a JSON decoder would, so a mode that drops them lets them be freed."""
+    for i in range(n):
+        row = dict(TEMPLATE)
+        row["hash"] = f"0x{i:064x}"
+        row["blockNumber"] = str(14923678 + i // 100)
+        row["nonce"] = str(i)
+        yield row
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak rather than current RSS, in kilobytes on Linux and bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_mode(mode: str, n: int) -> None:
+    make = MODES[mode]
+    rss_before = rss_bytes()
+
+    start = time.perf_counter()
+    events = [make(row) for row in rows(n)]
+    elapsed = time.perf_counter() - start
+
+    rss_after = rss_bytes()
+    print(
+        f"{mode:<14} {len(events):>9} events   {elapsed:7.2f} s   "
+        f"{(rss_after - rss_before) / 2**20:8.1f} MiB   {(rss_after - rss_before) / n:7.0f} B/event"
+    )
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("-n", type=int, default=1_000_000, help="Number of events per mode")
+    parser.add_argument("--mode", choices=list(MODES), help="Run a single mode in this process")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: Namespace = parse_args()
+
+    if args.mode is not None:
+        run_mode(args.mode, args.n)
+        return
+
+    # start each mode the way this one was started: as a module with -m, or as a script, where __spec__ is None
+    command = [sys.executable, "-m", __spec__.name] if __spec__ is not None else [sys.executable, __file__]
+    for mode in MODES:
+        subprocess.run(command + ["-n", str(args.n), "--mode", mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# blocks this far below the chain head are treated as immutable
+DEFAULT_FINALITY_DEPTH = 256
+
+# rows read from disk per query when replaying a covered range
+ROW_BATCH_SIZE = 1000
+
+# walks that have neither finished nor been aborted after this long are assumed dead and their rows dropped
+STALE_WALK_SECONDS = 24 * 60 * 60
+
+
+class EtherscanCache:
+    """
+    An on-disk SQLite cache of Etherscan account results.
+
+    Results are stored per (action, address, contract) together with the contiguous block range they fully cover.
+    Only finalized blocks are ever cached, so a covered range never goes stale and repeat queries only need to ask
+    Etherscan for the blocks after it. Once the rows outgrow `max_bytes`, the least recently used keys are evicted.
+
+    Each walk that fetches new rows stages them under its own token, so walks over the same key can overlap. Only the
+    first to finish extends the range; the others find the range moved, or their rows evicted, and are discarded.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, finality_depth: int = DEFAULT_FINALITY_DEPTH):
+        """
+        Constructor for the EtherscanCache class.
+
+        Parameters:
+        path (str): The SQLite database file.
+        max_bytes (int, optional): The size cap for cached rows. Defaults to 512 MiB.
+        finality_depth (int, optional): The number of blocks below the chain head that are never cached.
+            Defaults to 256.
+        """
+        self._max_bytes: int = max_bytes
+        self._finality_depth: int = finality_depth
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ranges (
+                key TEXT PRIMARY KEY,
+                start_block INTEGER NOT NULL,
+                end_block INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rows (
+                key TEXT NOT NULL,
+                block_number INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS rows_key_block ON rows (key, block_number);
+            CREATE TABLE IF NOT EXISTS walks (
+                walk TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                base_end INTEGER,
+                staged INTEGER NOT NULL,
+                started_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS staged (
+                walk TEXT NOT NULL,
+                key TEXT NOT NULL,
+                block_number INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS staged_walk ON staged (walk);
+            """)
+
+    @property
+    def finality_depth(self) -> int:
+        return self._finality_depth
+
+    @staticmethod
+    def key(action: str, address: str, contract_address: Optional[str] = "") -> str:
+        return f"{action}:{address.lower()}:{(contract_address or '').lower()}"
+
+    def get_range(self, key: str) -> Optional[Tuple[int, int]]:
+        """Return the block range covered for `key`, if any."""
+        with self._lock:
+            row = self._conn.execute("SELECT start_block, end_block FROM ranges WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def iter_rows(self, key: str, start_block: int, end_block: int) -> Iterator[Dict[str, Any]]:
+        """Yield the cached rows for `key` in [start_block, end_block], in insertion order, ROW_BATCH_SIZE at a time."""
+        with self._lock:
+            self._conn.execute("UPDATE ranges SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, data FROM rows WHERE key = ? AND block_number BETWEEN ? AND ? AND rowid > ? "
+                    "ORDER BY rowid LIMIT ?",
+                    (key, start_block, end_block, last_rowid, ROW_BATCH_SIZE),
+                ).fetchall()
+            if not rows:
+                return
+
+            for last_rowid, data in rows:
+                yield json.loads(data)
+
+    def begin(self, key: str) -> str:
+        """
+        Start a walk that stages rows for `key` past its covered range. Returns the token to pass to `add_rows`,
+        `extend` and `abort`.
+        """
+        walk = uuid.uuid4().hex
+        covered = self.get_range(key)
+        with self._lock:
+            stale = time.time() - STALE_WALK_SECONDS
+            self._conn.execute(
+                "DELETE FROM staged WHERE walk IN (SELECT walk FROM walks WHERE started_at < ?)", (stale,)
+            )
+            self._conn.execute("DELETE FROM walks WHERE started_at < ?", (stale,))
+            self._conn.execute(
+                "INSERT INTO walks (walk, key, base_end, staged, started_at) VALUES (?, ?, ?, 0, ?)",
+                (walk, key, covered[1] if covered is not None else None, time.time()),
+            )
+            self._conn.commit()
+        return walk
+
+    def add_rows(self, key: str, walk: str, rows: Iterable[Dict[str, Any]]) -> None:
+        """Stage rows for `key` under `walk`. They are not served until `extend` marks their range as covered."""
+        with self._lock:
+            cursor = self._conn.executemany(
+                "INSERT INTO staged (walk, key, block_number, data) VALUES (?, ?, ?, ?)",
+                ((walk, key, int(row["blockNumber"]), json.dumps(row)) for row in rows),
+            )
+            self._conn.execute("UPDATE walks SET staged = staged + ? WHERE walk = ?", (cursor.rowcount, walk))
+            self._conn.commit()
+
+    def extend(self, key: str, walk: str, start_block: int, end_block: int) -> bool:
+        """
+        Publish the rows staged by `walk` and mark [start_block, end_block] as fully covered for `key`, joining it to
+        the range already covered. Nothing is published if the covered range changed since `begin` or any staged
+        row is gone. Returns whether the range was extended.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                extended = self._publish(key, walk, start_block, end_block)
+                self._conn.execute("DELETE FROM staged WHERE walk = ?", (walk,))
+                self._conn.execute("DELETE FROM walks WHERE walk = ?", (walk,))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+        if extended:
+            self._evict(keep=key)
+        return extended
+
+    def _publish(self, key: str, walk: str, start_block: int, end_block: int) -> bool:
+        """Must be called with the lock held, inside a transaction."""
+        started = self._conn.execute("SELECT base_end, staged FROM walks WHERE walk = ?", (walk,)).fetchone()
+        if started is None:
+            return False
+        base_end, expected = started
+
+        covered = self._conn.execute("SELECT start_block, end_block FROM ranges WHERE key = ?", (key,)).fetchone()
+        if (covered[1] if covered is not None else None) != base_end:
+            return False
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM staged WHERE walk = ?", (walk,)).fetchone()
+        if count != expected:
+            return False
+
+        if covered is not None:
+            start_block = min(start_block, covered[0])
+            # rows left past the covered range by older versions of the cache
+            self._conn.execute("DELETE FROM rows WHERE key = ? AND block_number > ?", (key, covered[1]))
+        else:
+            self._conn.execute("DELETE FROM rows WHERE key = ?", (key,))
+
+        self._conn.execute(
+            "INSERT INTO rows (key, block_number, data) SELECT key, block_number, data FROM staged WHERE walk = ? "
+            "ORDER BY rowid",
+            (walk,),
+        )
+        (size,) = self._conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM rows WHERE key = ?", (key,)).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ranges (key, start_block, end_block, size, last_access) VALUES (?, ?, ?, ?, ?)",
+            (key, start_block, end_block, size, time.time()),
+        )
+        return True
+
+    def abort(self, walk: str) -> None:
+        """Drop the rows staged by a walk that will not finish."""
+        with self._lock:
+            self._conn.execute("DELETE FROM staged WHERE walk = ?", (walk,))
+            self._conn.execute("DELETE FROM walks WHERE walk = ?", (walk,))
+            self._conn.commit()
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ranges").fetchone()
+            if total <= self._max_bytes:
+                return
+
+            lru = self._conn.execute(
+                "SELECT key, size FROM ranges WHERE key != ? ORDER BY last_access", (keep,)
+            ).fetchall()
+            for key, size in lru:
+                if total <= self._max_bytes:
+                    break
+                self._conn.execute("DELETE FROM rows WHERE key = ?", (key,))
+                self._conn.execute("DELETE FROM staged WHERE key = ?", (key,))
+                self._conn.execute("DELETE FROM ranges WHERE key = ?", (key,))
+                total -= size
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
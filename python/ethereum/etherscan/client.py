@@ -1,31 +1,153 @@
-import json
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Type, TypeVar
 
-import requests
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.etherscan.cache import EtherscanCache
+from potpourri.python.ethereum.etherscan.compact import (
+    CompactBaseEvent,
+    CompactERC20Transfer,
+    CompactERC721Transfer,
+    CompactERC1155Transfer,
+    CompactInternalTransaction,
+    CompactTransaction,
+)
 from potpourri.python.ethereum.etherscan.erc20 import ERC20Transfer
 from potpourri.python.ethereum.etherscan.erc721 import ERC721Transfer
 from potpourri.python.ethereum.etherscan.erc1155 import ERC1155Transfer
+from potpourri.python.ethereum.etherscan.event_table import EventTable
+from potpourri.python.ethereum.etherscan.rate_limit import RateLimiter, get_rate_limiter
 from potpourri.python.ethereum.etherscan.transaction import InternalTransaction, Transaction
+from potpourri.python.utils import json_codec
+from potpourri.python.utils.http_session import HttpSession, get_default_session
+
+try:
+    from potpourri.python.ethereum.etherscan import schema
+except ImportError:
+    # msgspec is not installed, so every page is decoded into dicts
+    schema = None
+
+# Etherscan only serves the first 10000 rows of a query (page * offset <= 10000)
+MAX_RESULT_WINDOW = 10000
+
+# the most addresses a single balancemulti call accepts
+BALANCEMULTI_MAX_ADDRESSES = 20
+
+E = TypeVar("E", bound=BaseEvent)
+
+# account action -> the compact event class of its rows
+COMPACT_EVENT_TYPES: Dict[str, Type[CompactBaseEvent]] = {
+    "txlist": CompactTransaction,
+    "txlistinternal": CompactInternalTransaction,
+    "tokentx": CompactERC20Transfer,
+    "tokennfttx": CompactERC721Transfer,
+    "token1155tx": CompactERC1155Transfer,
+}
+
+# (start_block, end_block, page, offset) -> one page of events
+PageFetcher = Callable[[int, int, int, int], List[E]]
+
+
+def iter_block_pages(fetch: PageFetcher, block: int, page_size: int) -> Iterator[E]:
+    """Walk the events of a single block by page number, for a block too busy to fit in one page."""
+    page = 1
+    while True:
+        if page * page_size > MAX_RESULT_WINDOW:
+            raise ValueError(f"Block {block} has more than {MAX_RESULT_WINDOW} events")
+
+        events: List[E] = fetch(block, block, page, page_size)
+        yield from events
+        if len(events) < page_size:
+            return
+        page += 1
+
+
+class EtherscanApiException(Exception):
+    """
+    An exception that is raised when the Etherscan API returns an error result.
+    """
+
+    pass
+
+
+class EtherscanRateLimitException(EtherscanApiException):
+    """
+    An exception that is raised when the Etherscan API keeps rate limiting a request.
+    """
+
+    pass
 
 
 class EtherscanClient:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        session: Optional[HttpSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5,
+        cache: Optional[EtherscanCache] = None,
+    ):
         self._base_url = f"https://api.etherscan.io/api?apikey={api_key}"
+        self._session: HttpSession = session or get_default_session()
+        self._rate_limiter: RateLimiter = rate_limiter or get_rate_limiter(api_key)
+        self._max_retries: int = max_retries
+        self._cache: Optional[EtherscanCache] = cache
 
     @staticmethod
     def tx_url(hash_: str) -> str:
         return f"https://etherscan.io/tx/{hash_}"
 
-    def query(self, url) -> Dict[str, Any]:
-        response = requests.get(url)
+    @staticmethod
+    def _is_rate_limited(response_json: Dict[str, Any]) -> bool:
+        # {'status': '0', 'message': 'NOTOK', 'result': 'Max rate limit reached'}
+        result = response_json.get("result")
+        return response_json.get("status") == "0" and isinstance(result, str) and "rate limit" in result.lower()
+
+    @staticmethod
+    def _check_response(response_json: Dict[str, Any]) -> None:
+        # {'status': '0', 'message': 'No transactions found', 'result': []} is an empty result, not an error
+        if response_json.get("status") == "0" and response_json.get("message", "").startswith("NOTOK"):
+            raise EtherscanApiException(response_json.get("result"))
+
+    @staticmethod
+    def _decode(content: bytes, action: Optional[str]) -> Dict[str, Any]:
+        # a page that fits the action's schema is decoded and converted in one pass, anything else as plain JSON
+        if action is not None and schema is not None:
+            page: Optional[Dict[str, Any]] = schema.decode_page(action, content)
+            if page is not None:
+                return page
+        return json_codec.loads(content)
+
+    def query(self, url, action: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Request `url` and return the decoded response. If `action` has a schema in etherscan.schema and msgspec is
+        installed, the rows of `result` are typed rows instead of dicts.
+        """
+        for _ in range(self._max_retries + 1):
+            self._rate_limiter.acquire()
+            response = self._session.get(url)
+
+            if response.status_code != 200:
+                raise ValueError(f"Status Code: {response.status_code}")
+            else:
+                response_json = self._decode(response.content, action)
+
+            if self._is_rate_limited(response_json):
+                self._rate_limiter.on_rate_limited()
+                continue
 
-        if response.status_code != 200:
-            raise ValueError("Status Code: {r.status_code}")
-        else:
-            response_json = json.loads(response.content)
+            self._rate_limiter.on_success()
+            self._check_response(response_json)
+            return response_json
 
-        return response_json
+        raise EtherscanRateLimitException(f"Still rate limited after {self._max_retries} retries")
+
+    def get_block_number(self) -> int:
+        query_args = "&".join(["module=proxy", "action=eth_blockNumber"])
+        url = f"{self._base_url}&{query_args}"
+
+        response: Dict[str, str] = self.query(url)
+        return int(response["result"], 16)
 
     def get_account_balance(self, address: str) -> Decimal:
         query_args = "&".join(["module=account", "action=balance", f"address={address}", "tag=latest"])
@@ -35,6 +157,38 @@ class EtherscanClient:
         balance: str = response["result"]
         return Decimal(balance)
 
+    def _get_balancemulti(self, addresses: List[str]) -> Dict[str, Decimal]:
+        query_args = "&".join(["module=account", "action=balancemulti", f"address={','.join(addresses)}", "tag=latest"])
+        url = f"{self._base_url}&{query_args}"
+
+        # {'status': '1', 'message': 'OK', 'result': [{'account': '0x...', 'balance': '40891626854930000000000'}]}
+        response: Dict[str, Any] = self.query(url)
+        return {r["account"].lower(): Decimal(r["balance"]) for r in response["result"]}
+
+    def get_account_balances(self, addresses: Iterable[str], max_workers: int = 4) -> Dict[str, Decimal]:
+        """
+        Get the balances of many addresses, BALANCEMULTI_MAX_ADDRESSES per call with up to `max_workers` calls in
+        flight. The per-key rate limiter still paces the calls.
+
+        Parameters:
+        addresses (iterable of str): The addresses to look up.
+        max_workers (int, optional): The number of concurrent calls. Defaults to 4.
+
+        Returns:
+        dict: The balance in wei of each address, keyed and ordered as given.
+        """
+        addresses = list(addresses)
+        chunks = [
+            addresses[i : i + BALANCEMULTI_MAX_ADDRESSES] for i in range(0, len(addresses), BALANCEMULTI_MAX_ADDRESSES)
+        ]
+
+        balances: Dict[str, Decimal] = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="balancemulti") as executor:
+            for chunk_balances in executor.map(self._get_balancemulti, chunks):
+                balances.update(chunk_balances)
+
+        return {address: balances[address.lower()] for address in addresses}
+
     def get_txlist(
         self,
         address: str,
@@ -203,3 +357,238 @@ class EtherscanClient:
         response: Dict[str, Any] = self.query(url)
         result: List[ERC1155Transfer] = [ERC1155Transfer(t) for t in response["result"]]
         return result
+
+    def _account_url(
+        self,
+        action: str,
+        address: str,
+        contract_address: Optional[str],
+        start_block: int,
+        end_block: int,
+        page: int,
+        offset: int,
+    ) -> str:
+        query_args_list = [
+            "module=account",
+            f"action={action}",
+            f"address={address}",
+            f"startblock={start_block}",
+            f"endblock={end_block}",
+            f"page={page}",
+            f"offset={offset}",
+            "sort=asc",
+        ]
+        if contract_address:
+            query_args_list.append(f"contractaddress={contract_address}")
+
+        query_args = "&".join(query_args_list)
+        return f"{self._base_url}&{query_args}"
+
+    def get_event_table(
+        self,
+        action: str,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> EventTable:
+        """
+        Fetch one page of an account action (txlist, tokentx, ...) straight into an EventTable. With msgspec installed,
+        txlist and tokentx pages skip the dicts and are decoded into typed rows.
+        """
+        url = self._account_url(action, address, contract_address, start_block, end_block, page, offset)
+
+        response: Dict[str, Any] = self.query(url, action=action)
+        return EventTable.from_response(response)
+
+    def get_compact_events(
+        self,
+        action: str,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page: int = 1,
+        offset: int = 0,
+    ) -> List[CompactBaseEvent]:
+        """
+        Fetch one page of an account action (txlist, tokentx, ...) as compact events. With msgspec installed, txlist
+        and tokentx pages skip the dicts and are decoded into typed rows.
+        """
+        event_type: Type[CompactBaseEvent] = COMPACT_EVENT_TYPES[action]
+        url = self._account_url(action, address, contract_address, start_block, end_block, page, offset)
+
+        response: Dict[str, Any] = self.query(url, action=action)
+        return [
+            event_type.from_struct(row) if not isinstance(row, dict) else event_type(row) for row in response["result"]
+        ]
+
+    def _iter_pages(self, fetch: PageFetcher, start_block: int, end_block: int, page_size: int) -> Iterator[E]:
+        """
+        Walk every event in [start_block, end_block], one page in memory at a time.
+
+        Pages are requested with sort=asc, so once a page comes back full the next window starts at the block of the
+        last event. That block may have been cut off mid-page, so its events are held back and fetched again as the
+        start of the next window.
+        """
+        if not 0 < page_size <= MAX_RESULT_WINDOW:
+            raise ValueError(f"page_size must be in (0, {MAX_RESULT_WINDOW}]. Got: {page_size}")
+
+        cursor = start_block
+        while cursor <= end_block:
+            events: List[E] = fetch(cursor, end_block, 1, page_size)
+            if len(events) < page_size:
+                yield from events
+                return
+
+            last_block = events[-1].block_number
+            if events[0].block_number == last_block:
+                # the whole page is a single block, so moving the window would not make progress
+                yield from iter_block_pages(fetch, last_block, page_size)
+                cursor = last_block + 1
+                continue
+
+            for event in events:
+                if event.block_number == last_block:
+                    break
+                yield event
+            cursor = last_block
+
+    def _iter_cached(
+        self,
+        event_type: Type[E],
+        action: str,
+        address: str,
+        contract_address: Optional[str],
+        fetch: PageFetcher,
+        start_block: int,
+        end_block: int,
+        page_size: int,
+    ) -> Iterator[E]:
+        """
+        Serve the part of [start_block, end_block] covered by the cache from disk, and only ask Etherscan for the rest.
+        Fetched rows from finalized blocks are added to the cache as they stream past.
+        """
+        if self._cache is None:
+            yield from self._iter_pages(fetch, start_block, end_block, page_size)
+            return
+
+        key = EtherscanCache.key(action, address, contract_address)
+        covered = self._cache.get_range(key)
+
+        cursor = start_block
+        if covered is not None and covered[0] <= start_block <= covered[1] + 1:
+            cached_end = min(end_block, covered[1])
+            for data in self._cache.iter_rows(key, start_block, cached_end):
+                yield event_type(data)
+            cursor = cached_end + 1
+        elif covered is not None:
+            # not contiguous with what is cached, so fetch it all and leave the cache alone
+            yield from self._iter_pages(fetch, start_block, end_block, page_size)
+            return
+
+        if cursor > end_block:
+            return
+
+        finalized = self.get_block_number() - self._cache.finality_depth
+        if cursor > finalized:
+            yield from self._iter_pages(fetch, cursor, end_block, page_size)
+            return
+
+        walk = self._cache.begin(key)
+        extended = False
+        try:
+            staged: List[Dict[str, Any]] = []
+            for event in self._iter_pages(fetch, cursor, end_block, page_size):
+                if event.block_number <= finalized:
+                    staged.append(event.json)
+                    if len(staged) >= page_size:
+                        self._cache.add_rows(key, walk, staged)
+                        staged = []
+                yield event
+
+            self._cache.add_rows(key, walk, staged)
+            extended = self._cache.extend(key, walk, cursor, min(end_block, finalized))
+        finally:
+            # closed early, failed, or lost to an overlapping walk
+            if not extended:
+                self._cache.abort(walk)
+
+    def iter_txlist(
+        self,
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page_size: int = MAX_RESULT_WINDOW,
+    ) -> Iterator[Transaction]:
+        def fetch(start: int, end: int, page: int, offset: int) -> List[Transaction]:
+            return self.get_txlist(address, start_block=start, end_block=end, page=page, offset=offset)
+
+        return self._iter_cached(Transaction, "txlist", address, "", fetch, start_block, end_block, page_size)
+
+    def iter_txlistinternal(
+        self,
+        address: str,
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page_size: int = MAX_RESULT_WINDOW,
+    ) -> Iterator[InternalTransaction]:
+        def fetch(start: int, end: int, page: int, offset: int) -> List[InternalTransaction]:
+            return self.get_txlistinternal(address, start_block=start, end_block=end, page=page, offset=offset)
+
+        return self._iter_cached(
+            InternalTransaction, "txlistinternal", address, "", fetch, start_block, end_block, page_size
+        )
+
+    def iter_tokentx(
+        self,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page_size: int = MAX_RESULT_WINDOW,
+    ) -> Iterator[ERC20Transfer]:
+        def fetch(start: int, end: int, page: int, offset: int) -> List[ERC20Transfer]:
+            return self.get_tokentx(
+                address, contract_address, start_block=start, end_block=end, page=page, offset=offset
+            )
+
+        return self._iter_cached(
+            ERC20Transfer, "tokentx", address, contract_address, fetch, start_block, end_block, page_size
+        )
+
+    def iter_tokennfttx(
+        self,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page_size: int = MAX_RESULT_WINDOW,
+    ) -> Iterator[ERC721Transfer]:
+        def fetch(start: int, end: int, page: int, offset: int) -> List[ERC721Transfer]:
+            return self.get_tokennfttx(
+                address, contract_address, start_block=start, end_block=end, page=page, offset=offset
+            )
+
+        return self._iter_cached(
+            ERC721Transfer, "tokennfttx", address, contract_address, fetch, start_block, end_block, page_size
+        )
+
+    def iter_token1155tx(
+        self,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: int = 99999999,
+        page_size: int = MAX_RESULT_WINDOW,
+    ) -> Iterator[ERC1155Transfer]:
+        def fetch(start: int, end: int, page: int, offset: int) -> List[ERC1155Transfer]:
+            return self.get_token1155tx(
+                address, contract_address, start_block=start, end_block=end, page=page, offset=offset
+            )
+
+        return self._iter_cached(
+            ERC1155Transfer, "token1155tx", address, contract_address, fetch, start_block, end_block, page_size
+        )
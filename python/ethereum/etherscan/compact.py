@@ -0,0 +1,226 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+from potpourri.python.ethereum.etherscan.base import TransactionHash
+from potpourri.python.ethereum.units import to_decimal, wei_to_eth, wei_to_gwei
+
+# (attribute, JSON key, parse, unparse)
+Field = Tuple[str, str, Callable[[str], Any], Callable[[Any], str]]
+
+
+def _int_field(name: str, key: str) -> Field:
+    return (name, key, int, str)
+
+
+def _str_field(name: str, key: str) -> Field:
+    return (name, key, _identity, _identity)
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class _LazyField:
+    """Keeps the raw string in a slot and replaces it with the parsed value on first access."""
+
+    __slots__ = ("slot", "bit", "parse")
+
+    def __init__(self, slot: str, bit: int, parse: Callable[[str], Any]):
+        self.slot = slot
+        self.bit = bit
+        self.parse = parse
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if not obj._parsed & self.bit:
+            value = self.parse(value)
+            setattr(obj, self.slot, value)
+            obj._parsed |= self.bit
+        return value
+
+
+def lazy_fields(cls: Type["CompactBaseEvent"]) -> Type["CompactBaseEvent"]:
+    """Install a _LazyField for each of the FIELDS a class declares on top of its parent."""
+    inherited: Tuple[Field, ...] = getattr(cls.__mro__[1], "ALL_FIELDS", ())
+    for i, (name, _, parse, _) in enumerate(cls.FIELDS, start=len(inherited)):
+        setattr(cls, name, _LazyField(f"_{name}", 1 << i, parse))
+    cls.ALL_FIELDS = inherited + cls.FIELDS
+    # for from_struct: the slot and attribute of each field, and the bits of the fields a typed row already converted
+    cls.STRUCT_SLOTS = tuple((f"_{name}", name) for name, _, _, _ in cls.ALL_FIELDS)
+    cls.INT_FIELDS_MASK = sum(1 << i for i, (_, _, parse, _) in enumerate(cls.ALL_FIELDS) if parse is int)
+    return cls
+
+
+@lazy_fields
+class CompactBaseEvent:
+    """
+    A compact counterpart of BaseEvent.
+
+    Fields live in __slots__ and are only int()-converted the first time they are read. By default the raw dict is
+    not kept either and `json` is rebuilt from the fields on demand, which drops any keys the class does not declare.
+    """
+
+    FIELDS: Tuple[Field, ...] = (
+        _int_field("block_number", "blockNumber"),
+        _str_field("contract_address", "contractAddress"),
+        _str_field("from_address", "from"),
+        _int_field("gas", "gas"),
+        _int_field("gas_used", "gasUsed"),
+        ("hash", "hash", TransactionHash, str),
+        _str_field("input", "input"),
+        _int_field("timestamp", "timeStamp"),
+        _str_field("to_address", "to"),
+    )
+    ALL_FIELDS: Tuple[Field, ...]
+    STRUCT_SLOTS: Tuple[Tuple[str, str], ...]
+    INT_FIELDS_MASK: int
+
+    __slots__ = ("_data", "_parsed") + tuple(f"_{name}" for name, _, _, _ in FIELDS)
+
+    def __init__(self, data: Dict[str, str], keep_json: bool = False):
+        for name, key, _, _ in self.ALL_FIELDS:
+            setattr(self, f"_{name}", data[key])
+        self._parsed: int = 0
+        self._data: Optional[Dict[str, str]] = data if keep_json else None
+
+    @classmethod
+    def from_struct(cls, row: Any) -> "CompactBaseEvent":
+        """
+        Build an event from a typed row of etherscan.schema (TxlistRow for CompactTransaction, TokentxRow for
+        CompactERC20Transfer). The row's int fields are stored as already parsed, the rest as raw strings.
+        """
+        event = cls.__new__(cls)
+        for slot, name in cls.STRUCT_SLOTS:
+            setattr(event, slot, getattr(row, name))
+        event._parsed = cls.INT_FIELDS_MASK
+        event._data = None
+        return event
+
+    @property
+    def timestamp_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp).astimezone(tz=timezone.utc)
+
+    @property
+    def json(self) -> Dict[str, str]:
+        if self._data is not None:
+            return self._data
+        data: Dict[str, str] = {}
+        for i, (name, key, _, unparse) in enumerate(self.ALL_FIELDS):
+            value = getattr(self, f"_{name}")
+            data[key] = unparse(value) if self._parsed & (1 << i) else value
+        return data
+
+
+@lazy_fields
+class CompactBaseEventDetailed(CompactBaseEvent):
+    FIELDS = (
+        _str_field("block_hash", "blockHash"),
+        _int_field("confirmations", "confirmations"),
+        _int_field("cumulative_gas_used", "cumulativeGasUsed"),
+        _int_field("gas_price", "gasPrice"),
+        _int_field("nonce", "nonce"),
+        _int_field("transaction_index", "transactionIndex"),
+    )
+    __slots__ = tuple(f"_{name}" for name, _, _, _ in FIELDS)
+
+
+@lazy_fields
+class CompactTransaction(CompactBaseEventDetailed):
+    FIELDS = (
+        _int_field("is_error", "isError"),
+        (
+            "txreceipt_status",
+            "txreceipt_status",
+            lambda s: int(s) if s != "" else None,
+            lambda v: str(v) if v is not None else "",
+        ),
+        _int_field("value_wei", "value"),
+    )
+    __slots__ = tuple(f"_{name}" for name, _, _, _ in FIELDS)
+
+    @property
+    def fee_wei(self) -> int:
+        return self.gas_used * self.gas_price
+
+    @property
+    def fee_gwei(self) -> Decimal:
+        return wei_to_gwei(self.fee_wei)
+
+    @property
+    def fee_eth(self) -> Decimal:
+        return wei_to_eth(self.fee_wei)
+
+    @property
+    def value_gwei(self) -> Decimal:
+        return wei_to_gwei(self.value_wei)
+
+    @property
+    def value_eth(self) -> Decimal:
+        return wei_to_eth(self.value_wei)
+
+
+@lazy_fields
+class CompactInternalTransaction(CompactBaseEvent):
+    FIELDS = (
+        _int_field("is_error", "isError"),
+        _int_field("value_wei", "value"),
+        _str_field("trace_id", "traceId"),
+    )
+    __slots__ = tuple(f"_{name}" for name, _, _, _ in FIELDS)
+
+    @property
+    def value_gwei(self) -> Decimal:
+        return wei_to_gwei(self.value_wei)
+
+    @property
+    def value_eth(self) -> Decimal:
+        return wei_to_eth(self.value_wei)
+
+
+class CompactTokenTransfer(CompactBaseEventDetailed):
+    __slots__ = ()
+
+    def __init__(self, data: Dict[str, str], keep_json: bool = False):
+        super().__init__(data, keep_json=keep_json)
+
+        assert data["input"] == "deprecated", f"Expected 'deprecated' value for 'input'. Got: '{data['input']}'"
+
+
+@lazy_fields
+class CompactERC20Transfer(CompactTokenTransfer):
+    FIELDS = (
+        _int_field("token_decimal", "tokenDecimal"),
+        _str_field("token_name", "tokenName"),
+        _str_field("token_symbol", "tokenSymbol"),
+        _int_field("value", "value"),
+    )
+    __slots__ = tuple(f"_{name}" for name, _, _, _ in FIELDS)
+
+    @property
+    def value_decimal(self) -> Decimal:
+        return to_decimal(self.value, self.token_decimal)
+
+
+@lazy_fields
+class CompactERC721Transfer(CompactTokenTransfer):
+    FIELDS = (
+        _int_field("token_id", "tokenID"),
+        _str_field("token_name", "tokenName"),
+        _str_field("token_symbol", "tokenSymbol"),
+        _int_field("token_decimal", "tokenDecimal"),
+    )
+    __slots__ = tuple(f"_{name}" for name, _, _, _ in FIELDS)
+
+
+@lazy_fields
+class CompactERC1155Transfer(CompactTokenTransfer):
+    FIELDS = (
+        _int_field("token_id", "tokenID"),
+        _str_field("token_name", "tokenName"),
+        _str_field("token_symbol", "tokenSymbol"),
+        _int_field("token_value", "tokenValue"),
+    )
+    __slots__ = tuple(f"_{name}" for name, _, _, _ in FIELDS)
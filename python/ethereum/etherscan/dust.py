@@ -0,0 +1,132 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from decimal import Decimal
+from typing import Deque, Dict, Iterable, Iterator, List, Set, Tuple
+
+from potpourri.python.ethereum.coinbase.client import CoinbaseNotFoundException
+from potpourri.python.ethereum.coinbase.price_service import PriceService
+from potpourri.python.ethereum.etherscan.client import EtherscanClient
+from potpourri.python.ethereum.units import to_decimal
+
+# contract -> (symbol, decimals, balance in token units)
+TokenBalances = Dict[str, Tuple[str, int, int]]
+
+
+class DustPosition:
+    """A token balance worth less than the scanner's USD threshold.
+
+    Attributes:
+        address (str): The wallet holding the token.
+        contract_address (str): The token contract.
+        token_symbol (str): The token symbol.
+        balance (Decimal): The balance in whole tokens.
+        price_usd (Decimal): The USD price of one token.
+    """
+
+    def __init__(self, address: str, contract_address: str, token_symbol: str, balance: Decimal, price_usd: Decimal):
+        self.address = address
+        self.contract_address = contract_address
+        self.token_symbol = token_symbol
+        self.balance = balance
+        self.price_usd = price_usd
+
+    @property
+    def value_usd(self) -> Decimal:
+        return self.balance * self.price_usd
+
+    def __repr__(self) -> str:
+        return f"DustPosition({self.address}, {self.token_symbol}, {self.balance}, ${self.value_usd:.4f})"
+
+
+class DustScanner:
+    """
+    Finds ERC20 positions worth less than a USD threshold across many wallets.
+
+    Each wallet's token transfers are streamed through EtherscanClient.iter_tokentx into running balances, so only
+    the balances are held, never the transfers. Up to `max_workers` wallets are scanned at once and results are
+    yielded as each wallet finishes, so memory stays bounded however many wallets are swept. Prices come from a
+    shared PriceService, one batch per wallet. Tokens Coinbase does not list are remembered and skipped; any other
+    pricing error is raised.
+
+    Tokens are priced by the `tokenSymbol` their transfers report, not by contract. Spam tokens reusing a real
+    symbol such as "USDC" are priced as the real token, so check `contract_address` before acting on a position.
+    """
+
+    def __init__(
+        self,
+        client: EtherscanClient,
+        prices: PriceService,
+        threshold_usd: Decimal = Decimal("1"),
+        max_workers: int = 4,
+    ):
+        self._client: EtherscanClient = client
+        self._prices: PriceService = prices
+        self._threshold_usd: Decimal = threshold_usd
+        self._max_workers: int = max_workers
+
+        self._unpriced_lock = threading.Lock()
+        self._unpriced: Set[str] = set()
+
+    def token_balances(self, address: str) -> TokenBalances:
+        """
+        Rebuild the ERC20 balances of `address` from its transfers, keyed by contract with the symbol and decimals
+        the transfers report. Only non-zero balances are returned.
+        """
+        address = address.lower()
+        balances: Dict[str, int] = {}
+        tokens: Dict[str, Tuple[str, int]] = {}
+        for transfer in self._client.iter_tokentx(address):
+            contract = (transfer.contract_address or "").lower()
+            tokens[contract] = (transfer.token_symbol, transfer.token_decimal)
+            if transfer.from_address.lower() == address:
+                balances[contract] = balances.get(contract, 0) - transfer.value
+            if transfer.to_address.lower() == address:
+                balances[contract] = balances.get(contract, 0) + transfer.value
+
+        return {contract: (*tokens[contract], units) for contract, units in balances.items() if units != 0}
+
+    def _get_prices(self, symbols: Iterable[str]) -> Dict[str, Decimal]:
+        with self._unpriced_lock:
+            symbols = [s.upper() for s in symbols if s.upper() not in self._unpriced]
+
+        try:
+            return self._prices.get_prices(symbols)
+        except CoinbaseNotFoundException:
+            pass
+
+        # Coinbase does not list one of the symbols, so find out which ones it does
+        prices: Dict[str, Decimal] = {}
+        for symbol in symbols:
+            try:
+                prices[symbol] = self._prices.get_price(symbol)
+            except CoinbaseNotFoundException:
+                with self._unpriced_lock:
+                    self._unpriced.add(symbol)
+        return prices
+
+    def scan_address(self, address: str) -> List[DustPosition]:
+        balances = self.token_balances(address)
+        prices = self._get_prices({symbol for symbol, _, units in balances.values() if units > 0})
+
+        dust: List[DustPosition] = []
+        for contract, (symbol, decimals, units) in balances.items():
+            price = prices.get(symbol.upper())
+            if units <= 0 or price is None:
+                continue
+            position = DustPosition(address, contract, symbol, to_decimal(units, decimals), price)
+            if position.value_usd < self._threshold_usd:
+                dust.append(position)
+        return dust
+
+    def scan(self, addresses: Iterable[str]) -> Iterator[DustPosition]:
+        """Yield the dust positions of every address, wallet by wallet, in the order the addresses are given."""
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="dust") as executor:
+            in_flight: Deque[Future] = deque()
+            for address in addresses:
+                in_flight.append(executor.submit(self.scan_address, address))
+                if len(in_flight) >= self._max_workers:
+                    yield from in_flight.popleft().result()
+
+            while in_flight:
+                yield from in_flight.popleft().result()
@@ -2,6 +2,7 @@ from decimal import Decimal
 from typing import Dict
 
 from potpourri.python.ethereum.etherscan.base import BaseEventDetailed
+from potpourri.python.ethereum.units import to_decimal
 
 
 class ERC20Transfer(BaseEventDetailed):
@@ -34,4 +35,4 @@ class ERC20Transfer(BaseEventDetailed):
 
     @property
     def value_decimal(self) -> Decimal:
-        return Decimal(self._value) / Decimal(10**self._token_decimal)
+        return to_decimal(self._value, self._token_decimal)
@@ -0,0 +1,189 @@
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.units import ETH_DECIMALS, scale_factor
+
+
+class EventTable:
+    """
+    A columnar table of Etherscan account results.
+
+    Rows are parsed straight from `response["result"]` into typed arrays, with addresses interned into a shared pool
+    and stored as indices, so a table takes a few dozen bytes per event instead of an object and a dict per event.
+    Values are kept as Python ints because token amounts do not fit in 64 bits. Fields a result kind does not have
+    (e.g. gasPrice for internal transactions) are stored as 0.
+    """
+
+    def __init__(self):
+        self.block_number = array("Q")
+        self.timestamp = array("Q")
+        self.transaction_index = array("Q")
+        self.gas = array("Q")
+        self.gas_used = array("Q")
+        self.gas_price = array("Q")  # wei
+        self.is_error = array("B")
+        self.token_decimal = array("B")
+        self.value: List[int] = []  # wei or token units
+        self.hash: List[str] = []
+
+        self.from_index = array("I")
+        self.to_index = array("I")
+        self.contract_index = array("I")
+
+        self._addresses: List[str] = []
+        self._address_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]]) -> "EventTable":
+        table = cls()
+        table.extend(rows)
+        return table
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> "EventTable":
+        """Build a table from a decoded response whose result holds dicts or the typed rows of etherscan.schema."""
+        rows: List[Any] = response["result"]
+        table = cls()
+        if rows and not isinstance(rows[0], dict):
+            table.extend_typed(rows)
+        else:
+            table.extend(rows)
+        return table
+
+    @classmethod
+    def from_events(cls, events: Iterable[BaseEvent]) -> "EventTable":
+        """Build a table from event objects, e.g. streamed from one of the EtherscanClient.iter_* generators."""
+        return cls.from_rows(event.json for event in events)
+
+    def _intern(self, address: Optional[str]) -> int:
+        address = sys.intern((address or "").lower())
+        index = self._address_index.get(address)
+        if index is None:
+            index = len(self._addresses)
+            self._addresses.append(address)
+            self._address_index[address] = index
+        return index
+
+    def extend(self, rows: Iterable[Dict[str, str]]) -> None:
+        for row in rows:
+            self.block_number.append(int(row["blockNumber"]))
+            self.timestamp.append(int(row["timeStamp"]))
+            self.transaction_index.append(int(row.get("transactionIndex") or 0))
+            self.gas.append(int(row["gas"]))
+            self.gas_used.append(int(row["gasUsed"]))
+            self.gas_price.append(int(row.get("gasPrice") or 0))
+            self.is_error.append(int(row.get("isError") or 0))
+            self.token_decimal.append(int(row.get("tokenDecimal") or 0))
+            self.value.append(int(row.get("value") or row.get("tokenValue") or 0))
+            self.hash.append(row["hash"])
+
+            self.from_index.append(self._intern(row["from"]))
+            self.to_index.append(self._intern(row["to"]))
+            self.contract_index.append(self._intern(row.get("contractAddress")))
+
+    def extend_typed(self, rows: Sequence[Any]) -> None:
+        """
+        Append TxlistRow or TokentxRow rows from etherscan.schema. Their fields are already converted, so each column
+        is copied over in one go.
+        """
+        if not rows:
+            return
+        self.block_number.extend([row.block_number for row in rows])
+        self.timestamp.extend([row.timestamp for row in rows])
+        self.transaction_index.extend([row.transaction_index for row in rows])
+        self.gas.extend([row.gas for row in rows])
+        self.gas_used.extend([row.gas_used for row in rows])
+        self.gas_price.extend([row.gas_price for row in rows])
+        self.is_error.extend([getattr(row, "is_error", 0) for row in rows])
+        self.token_decimal.extend([getattr(row, "token_decimal", 0) for row in rows])
+        value = "value_wei" if hasattr(rows[0], "value_wei") else "value"
+        self.value.extend([getattr(row, value) for row in rows])
+        self.hash.extend([row.hash for row in rows])
+
+        # row by row, so the address pool comes out in the same order as from dicts
+        for row in rows:
+            self.from_index.append(self._intern(row.from_address))
+            self.to_index.append(self._intern(row.to_address))
+            self.contract_index.append(self._intern(row.contract_address))
+
+    def __len__(self) -> int:
+        return len(self.block_number)
+
+    @property
+    def addresses(self) -> List[str]:
+        return self._addresses
+
+    @property
+    def from_address(self) -> List[str]:
+        return [self._addresses[i] for i in self.from_index]
+
+    @property
+    def to_address(self) -> List[str]:
+        return [self._addresses[i] for i in self.to_index]
+
+    @property
+    def contract_address(self) -> List[str]:
+        return [self._addresses[i] for i in self.contract_index]
+
+    @property
+    def fee_wei(self) -> List[int]:
+        return [gas_used * gas_price for gas_used, gas_price in zip(self.gas_used, self.gas_price)]
+
+    @property
+    def fee_eth(self) -> List[Decimal]:
+        scale = scale_factor(ETH_DECIMALS)
+        return [Decimal(fee) / scale for fee in self.fee_wei]
+
+    @property
+    def value_eth(self) -> List[Decimal]:
+        scale = scale_factor(ETH_DECIMALS)
+        return [Decimal(value) / scale for value in self.value]
+
+    @property
+    def value_decimal(self) -> List[Decimal]:
+        return [Decimal(value) / scale_factor(decimals) for value, decimals in zip(self.value, self.token_decimal)]
+
+    def total_fee_wei(self) -> int:
+        return sum(self.fee_wei)
+
+    def take(self, indices: Iterable[int]) -> "EventTable":
+        """Return a new table holding the given rows, sharing this table's address pool."""
+        indices = list(indices)
+        table = EventTable()
+        for name in (
+            "block_number",
+            "timestamp",
+            "transaction_index",
+            "gas",
+            "gas_used",
+            "gas_price",
+            "is_error",
+            "token_decimal",
+            "from_index",
+            "to_index",
+            "contract_index",
+        ):
+            column: array = getattr(self, name)
+            getattr(table, name).extend(column[i] for i in indices)
+        table.value = [self.value[i] for i in indices]
+        table.hash = [self.hash[i] for i in indices]
+        table._addresses = self._addresses
+        table._address_index = self._address_index
+        return table
+
+    def filter_address(self, address: str) -> "EventTable":
+        """Return the rows sent from or to `address`."""
+        index = self._address_index.get(address.lower())
+        if index is None:
+            return self.take([])
+        return self.take(i for i, (f, t) in enumerate(zip(self.from_index, self.to_index)) if f == index or t == index)
+
+    def filter_blocks(self, start_block: int, end_block: int) -> "EventTable":
+        """Return the rows in [start_block, end_block]. Rows must be sorted by block, as Etherscan returns them."""
+        lo = bisect_left(self.block_number, start_block)
+        hi = bisect_right(self.block_number, end_block)
+        return self.take(range(lo, hi))
@@ -0,0 +1,148 @@
+import heapq
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.etherscan.erc20 import ERC20Transfer
+from potpourri.python.ethereum.etherscan.erc721 import ERC721Transfer
+from potpourri.python.ethereum.etherscan.erc1155 import ERC1155Transfer
+from potpourri.python.ethereum.etherscan.transaction import InternalTransaction, Transaction
+
+ETH = "ETH"
+
+DEFAULT_CHECKPOINT_INTERVAL = 10000
+
+
+def event_order(event: BaseEvent) -> Tuple[int, int]:
+    # internal transactions have no transaction index, so they sort after the rest of their block
+    return (event.block_number, getattr(event, "transaction_index", sys.maxsize))
+
+
+def merge_events(*streams: Iterable[BaseEvent]) -> Iterator[BaseEvent]:
+    """Merge event streams that are each sorted ascending (as Etherscan returns them) into one ordered stream."""
+    return heapq.merge(*streams, key=event_order)
+
+
+def token_key(event: BaseEvent) -> str:
+    """The balance an event moves: ETH, an ERC20 contract, or a single ERC721/ERC1155 token id."""
+    if isinstance(event, (Transaction, InternalTransaction)):
+        return ETH
+    contract = (event.contract_address or "").lower()
+    if isinstance(event, (ERC721Transfer, ERC1155Transfer)):
+        return f"{contract}:{event.token_id}"
+    return contract
+
+
+def token_amount(event: BaseEvent) -> int:
+    if isinstance(event, (Transaction, InternalTransaction)):
+        return 0 if event.is_error else event.value_wei
+    if isinstance(event, ERC20Transfer):
+        return event.value
+    if isinstance(event, ERC721Transfer):
+        return 1
+    if isinstance(event, ERC1155Transfer):
+        return event.token_value
+    raise TypeError(f"Unsupported event type: {type(event).__name__}")
+
+
+class Ledger:
+    """
+    Running balances of one address, rebuilt from its Etherscan event streams in a single pass.
+
+    Amounts are integer base units (wei, token units) keyed by `token_key`. Gas paid for the address' own
+    transactions is deducted from its ETH balance and also totalled in `gas_spent_wei`.
+
+    The balances are snapshotted at the start of every `checkpoint_interval` blocks that see activity, and the
+    changes since are kept per interval, so `balance_at` looks up one snapshot and replays at most one interval.
+    """
+
+    def __init__(self, address: str, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        self._address: str = address.lower()
+        self._checkpoint_interval: int = checkpoint_interval
+
+        self._balances: Dict[str, int] = defaultdict(int)
+        self._gas_spent_wei: int = 0
+        self._last_block: int = -1
+
+        # interval -> balances before its first event, and the (block, token, delta) changes within it
+        self._intervals: List[int] = []
+        self._checkpoints: Dict[int, Dict[str, int]] = {}
+        self._deltas: Dict[int, List[Tuple[int, str, int]]] = {}
+
+    @classmethod
+    def from_streams(
+        cls, address: str, *streams: Iterable[BaseEvent], checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL
+    ) -> "Ledger":
+        """Build a ledger from any of the txlist, txlistinternal, tokentx, tokennfttx and token1155tx streams."""
+        ledger = cls(address, checkpoint_interval=checkpoint_interval)
+        ledger.apply_all(merge_events(*streams))
+        return ledger
+
+    @property
+    def balances(self) -> Dict[str, int]:
+        return {token: balance for token, balance in self._balances.items() if balance != 0}
+
+    @property
+    def gas_spent_wei(self) -> int:
+        return self._gas_spent_wei
+
+    @property
+    def last_block(self) -> int:
+        return self._last_block
+
+    def balance(self, token: str = ETH) -> int:
+        return self._balances.get(token, 0)
+
+    def _change(self, block_number: int, token: str, delta: int) -> None:
+        self._balances[token] += delta
+        self._deltas[block_number // self._checkpoint_interval].append((block_number, token, delta))
+
+    def apply(self, event: BaseEvent) -> None:
+        """Apply one event. Events must arrive in block order, e.g. from `merge_events`."""
+        if event.block_number < self._last_block:
+            raise ValueError(f"Events out of order: block {event.block_number} after block {self._last_block}")
+        self._last_block = event.block_number
+
+        interval = event.block_number // self._checkpoint_interval
+        if interval not in self._checkpoints:
+            self._intervals.append(interval)
+            self._checkpoints[interval] = dict(self._balances)
+            self._deltas[interval] = []
+
+        from_address = event.from_address.lower()
+        to_address = event.to_address.lower()
+
+        if isinstance(event, Transaction) and from_address == self._address:
+            self._gas_spent_wei += event.fee_wei
+            self._change(event.block_number, ETH, -event.fee_wei)
+
+        token = token_key(event)
+        amount = token_amount(event)
+        if amount == 0:
+            return
+        if from_address == self._address:
+            self._change(event.block_number, token, -amount)
+        if to_address == self._address:
+            self._change(event.block_number, token, amount)
+
+    def apply_all(self, events: Iterable[BaseEvent]) -> None:
+        for event in events:
+            self.apply(event)
+
+    def balance_at(self, token: str, block_number: int) -> int:
+        """Return the balance of `token` at the end of `block_number`."""
+        interval = block_number // self._checkpoint_interval
+        i = bisect_right(self._intervals, interval) - 1
+        if i < 0:
+            return 0
+
+        checkpoint_interval = self._intervals[i]
+        balance = self._checkpoints[checkpoint_interval].get(token, 0)
+        for delta_block, delta_token, delta in self._deltas[checkpoint_interval]:
+            if delta_block > block_number:
+                break
+            if delta_token == token:
+                balance += delta
+        return balance
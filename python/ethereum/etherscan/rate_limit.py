@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Etherscan free tier
+DEFAULT_CALLS_PER_SECOND = 5.0
+
+
+class RateLimiter:
+    """
+    A token bucket that adapts its rate to the responses it sees.
+
+    Every call reserves a token and sleeps until it is available, outside the lock, so the same limiter can be shared
+    by threads and coroutines. A rate-limit response halves the rate and every successful call wins back a small step
+    of it, which settles just under the limit the API actually enforces instead of retrying into it.
+    """
+
+    def __init__(
+        self,
+        calls_per_second: float = DEFAULT_CALLS_PER_SECOND,
+        burst: Optional[float] = None,
+        min_calls_per_second: float = 0.5,
+        backoff_factor: float = 0.5,
+    ):
+        """
+        Constructor for the RateLimiter class.
+
+        Parameters:
+        calls_per_second (float, optional): The maximum sustained rate. Defaults to 5.
+        burst (float, optional): The bucket size. Defaults to one second worth of calls.
+        min_calls_per_second (float, optional): The rate never backs off below this. Defaults to 0.5.
+        backoff_factor (float, optional): The rate is multiplied by this on a rate-limit response. Defaults to 0.5.
+        """
+        self._max_rate: float = calls_per_second
+        self._min_rate: float = min(min_calls_per_second, calls_per_second)
+        self._backoff_factor: float = backoff_factor
+        self._recovery_step: float = calls_per_second / 20
+        self._capacity: float = burst if burst is not None else calls_per_second
+
+        self._lock = threading.Lock()
+        self._rate: float = calls_per_second
+        self._tokens: float = self._capacity
+        self._updated_at: float = time.monotonic()
+        self._prepaid = threading.local()
+
+    @property
+    def calls_per_second(self) -> float:
+        return self._rate
+
+    def _reserve(self) -> float:
+        """Take a token and return how many seconds the caller has to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+            self._updated_at = now
+
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._rate
+
+    def acquire(self) -> None:
+        if getattr(self._prepaid, "token", False):
+            self._prepaid.token = False
+            return
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @contextmanager
+    def prepaid(self) -> Iterator[None]:
+        """Let the first `acquire` in this thread use a token the caller already took, e.g. with `acquire_async`."""
+        self._prepaid.token = True
+        try:
+            yield
+        finally:
+            self._prepaid.token = False
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._rate = min(self._max_rate, self._rate + self._recovery_step)
+
+    def on_rate_limited(self) -> None:
+        with self._lock:
+            self._rate = max(self._min_rate, self._rate * self._backoff_factor)
+            # drop any saved-up burst so the next call waits a full interval at the new rate
+            self._tokens = min(self._tokens, 0.0)
+            self._updated_at = time.monotonic()
+
+
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str, calls_per_second: float = DEFAULT_CALLS_PER_SECOND) -> RateLimiter:
+    """Return the limiter shared by every client in this process using `api_key`."""
+    with _rate_limiters_lock:
+        if api_key not in _rate_limiters:
+            _rate_limiters[api_key] = RateLimiter(calls_per_second)
+        return _rate_limiters[api_key]
@@ -0,0 +1,90 @@
+"""
+Typed msgspec schemas for Etherscan txlist and tokentx pages, so a page is decoded and its numeric fields converted
+in one pass instead of decoding dicts and then int()-ing every field.
+
+Etherscan sends numbers as strings, which msgspec converts in lax mode (strict=False). Fields that can be empty,
+like txreceipt_status on transactions from before Byzantium, stay strings. Row attributes are named like the compact
+event classes, so CompactBaseEvent.from_struct can take a row as is. Requires msgspec.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+
+class TxlistRow(msgspec.Struct):
+    block_number: int = msgspec.field(name="blockNumber")
+    timestamp: int = msgspec.field(name="timeStamp")
+    hash: str
+    nonce: int
+    block_hash: str = msgspec.field(name="blockHash")
+    transaction_index: int = msgspec.field(name="transactionIndex")
+    from_address: str = msgspec.field(name="from")
+    to_address: str = msgspec.field(name="to")
+    value_wei: int = msgspec.field(name="value")
+    gas: int
+    gas_price: int = msgspec.field(name="gasPrice")
+    is_error: int = msgspec.field(name="isError")
+    txreceipt_status: str
+    input: str
+    contract_address: str = msgspec.field(name="contractAddress")
+    cumulative_gas_used: int = msgspec.field(name="cumulativeGasUsed")
+    gas_used: int = msgspec.field(name="gasUsed")
+    confirmations: int
+
+
+class TokentxRow(msgspec.Struct):
+    block_number: int = msgspec.field(name="blockNumber")
+    timestamp: int = msgspec.field(name="timeStamp")
+    hash: str
+    nonce: int
+    block_hash: str = msgspec.field(name="blockHash")
+    from_address: str = msgspec.field(name="from")
+    contract_address: str = msgspec.field(name="contractAddress")
+    to_address: str = msgspec.field(name="to")
+    value: int
+    token_name: str = msgspec.field(name="tokenName")
+    token_symbol: str = msgspec.field(name="tokenSymbol")
+    token_decimal: int = msgspec.field(name="tokenDecimal")
+    transaction_index: int = msgspec.field(name="transactionIndex")
+    gas: int
+    gas_price: int = msgspec.field(name="gasPrice")
+    gas_used: int = msgspec.field(name="gasUsed")
+    cumulative_gas_used: int = msgspec.field(name="cumulativeGasUsed")
+    input: str
+    confirmations: int
+
+
+class TxlistPage(msgspec.Struct):
+    status: str
+    message: str
+    result: List[TxlistRow]
+
+
+class TokentxPage(msgspec.Struct):
+    status: str
+    message: str
+    result: List[TokentxRow]
+
+
+# action -> decoder of a whole response to it
+DECODERS: Dict[str, msgspec.json.Decoder] = {
+    "txlist": msgspec.json.Decoder(TxlistPage, strict=False),
+    "tokentx": msgspec.json.Decoder(TokentxPage, strict=False),
+}
+
+
+def decode_page(action: str, content: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Decode a response to `action` into a {"status", "message", "result"} dict whose result holds typed rows. Returns
+    None if there is no schema for the action or the response does not fit it, e.g. an error whose result is a
+    message, so the caller can fall back to decoding plain JSON.
+    """
+    decoder: Optional[msgspec.json.Decoder] = DECODERS.get(action)
+    if decoder is None:
+        return None
+    try:
+        page = decoder.decode(content)
+    except msgspec.DecodeError:
+        return None
+    return {"status": page.status, "message": page.message, "result": page.result}
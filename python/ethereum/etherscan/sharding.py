@@ -0,0 +1,120 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.etherscan.client import MAX_RESULT_WINDOW, EtherscanClient, iter_block_pages
+from potpourri.python.ethereum.etherscan.sync import ACTIONS, event_key
+
+# (start_block, end_block) -> (events, first block not covered by them)
+ShardResult = Tuple[List[BaseEvent], int]
+
+
+class ShardedDownloader:
+    """
+    Downloads the history of an address by splitting its block range into shards fetched in parallel.
+
+    Each shard is one request. A shard that comes back with a full page keeps the blocks it got completely and the
+    rest of its range is bisected and fetched again, so busy ranges end up split finely and quiet ones stay whole.
+    Shards are reassembled in block order as soon as a contiguous prefix of them is done.
+    """
+
+    def __init__(self, client: EtherscanClient, max_workers: int = 4, page_size: int = MAX_RESULT_WINDOW):
+        """
+        Constructor for the ShardedDownloader class.
+
+        Parameters:
+        client (EtherscanClient): The client to fetch shards with. Its rate limiter still applies.
+        max_workers (int, optional): The number of shards fetched at once. Defaults to 4.
+        page_size (int, optional): The rows requested per shard. Defaults to the 10k result window.
+        """
+        self._client: EtherscanClient = client
+        self._max_workers: int = max_workers
+        self._page_size: int = page_size
+
+    def _fetcher(self, action: str, address: str, contract_address: Optional[str]) -> Callable[..., List[BaseEvent]]:
+        get = getattr(self._client, f"get_{action}")
+        if action in ("txlist", "txlistinternal"):
+            return lambda start, end, page, offset: get(address, start, end, page, offset)
+        return lambda start, end, page, offset: get(address, contract_address, start, end, page, offset)
+
+    def _fetch_shard(self, fetch: Callable[..., List[BaseEvent]], start_block: int, end_block: int) -> ShardResult:
+        events = fetch(start_block, end_block, 1, self._page_size)
+        if len(events) < self._page_size:
+            return events, end_block + 1
+
+        last_block = events[-1].block_number
+        if events[0].block_number == last_block:
+            # a single block fills the page, so splitting further cannot help
+            return list(iter_block_pages(fetch, last_block, self._page_size)), last_block + 1
+
+        # the last block may have been cut off, so only the blocks before it are complete
+        return [e for e in events if e.block_number < last_block], last_block
+
+    def download(
+        self,
+        action: str,
+        address: str,
+        contract_address: Optional[str] = "",
+        start_block: int = 0,
+        end_block: Optional[int] = None,
+    ) -> Iterator[BaseEvent]:
+        """
+        Yield every event of `action` for `address` in [start_block, end_block], in block order.
+
+        Parameters:
+        action (str): One of "txlist", "txlistinternal", "tokentx", "tokennfttx" or "token1155tx".
+        address (str): The address to download.
+        contract_address (str, optional): Restrict token transfers to one contract.
+        start_block (int, optional): The first block. Defaults to 0.
+        end_block (int, optional): The last block. Defaults to the current chain head.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Expected one of {ACTIONS}. Got: '{action}'")
+        if end_block is None:
+            end_block = self._client.get_block_number()
+
+        fetch = self._fetcher(action, address, contract_address)
+
+        # shard start -> (shard end, events)
+        done: Dict[int, Tuple[int, List[BaseEvent]]] = {}
+        cursor = start_block
+        seen_block = -1
+        seen: Set[str] = set()
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="shard") as executor:
+            pending: Dict[Future, Tuple[int, int]] = {}
+
+            def submit(shard_start: int, shard_end: int) -> None:
+                future = executor.submit(self._fetch_shard, fetch, shard_start, shard_end)
+                pending[future] = (shard_start, shard_end)
+
+            width = max(1, (end_block - start_block + 1) // self._max_workers)
+            for shard_start in range(start_block, end_block + 1, width):
+                submit(shard_start, min(end_block, shard_start + width - 1))
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    shard_start, shard_end = pending.pop(future)
+                    events, next_block = future.result()
+                    done[shard_start] = (next_block - 1, events)
+
+                    if next_block <= shard_end:
+                        middle = (next_block + shard_end) // 2
+                        submit(next_block, middle)
+                        if middle < shard_end:
+                            submit(middle + 1, shard_end)
+
+                while cursor in done:
+                    shard_end, events = done.pop(cursor)
+                    for event in events:
+                        # shards do not overlap, but Etherscan can repeat a row across pages
+                        if event.block_number != seen_block:
+                            seen_block = event.block_number
+                            seen.clear()
+                        key = event_key(event)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        yield event
+                    cursor = shard_end + 1
@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+from typing import Dict, Iterator, Optional, Set
+
+from potpourri.python.ethereum.etherscan.base import BaseEvent
+from potpourri.python.ethereum.etherscan.client import EtherscanClient
+
+ACTIONS = ("txlist", "txlistinternal", "tokentx", "tokennfttx", "token1155tx")
+
+# blocks below the high-water mark that are fetched again in case they were reorganized
+DEFAULT_REORG_DEPTH = 12
+
+# a transaction can carry several internal calls and transfers, so the hash alone does not identify an event
+EVENT_KEY_FIELDS = ("hash", "traceId", "contractAddress", "from", "to", "tokenID", "value", "tokenValue")
+
+
+def event_key(event: BaseEvent) -> str:
+    data = event.json
+    return "|".join(str(data.get(field, "")) for field in EVENT_KEY_FIELDS)
+
+
+class IncrementalSync:
+    """
+    Fetches only the activity an address has had since the last run.
+
+    The last fully ingested block is persisted per (address, action), and each run starts `reorg_depth` blocks below
+    it so that reorganized blocks are picked up again. Events from that overlap that were already yielded are
+    skipped by their event key.
+    """
+
+    def __init__(self, client: EtherscanClient, path: str, reorg_depth: int = DEFAULT_REORG_DEPTH):
+        """
+        Constructor for the IncrementalSync class.
+
+        Parameters:
+        client (EtherscanClient): The client to fetch events with.
+        path (str): The SQLite database file holding the sync state.
+        reorg_depth (int, optional): The number of blocks to fetch again on each run. Defaults to 12.
+        """
+        self._client: EtherscanClient = client
+        self._reorg_depth: int = reorg_depth
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS high_water (
+                address TEXT NOT NULL,
+                action TEXT NOT NULL,
+                block_number INTEGER NOT NULL,
+                PRIMARY KEY (address, action)
+            );
+            CREATE TABLE IF NOT EXISTS seen (
+                address TEXT NOT NULL,
+                action TEXT NOT NULL,
+                block_number INTEGER NOT NULL,
+                key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS seen_address_action ON seen (address, action);
+            """)
+
+    def high_water(self, address: str, action: str) -> Optional[int]:
+        """Return the last block fully ingested for `address` and `action`, if it was ever synced."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT block_number FROM high_water WHERE address = ? AND action = ?", (address.lower(), action)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def _seen_keys(self, address: str, action: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM seen WHERE address = ? AND action = ?", (address.lower(), action)
+            ).fetchall()
+        return {key for (key,) in rows}
+
+    def _commit(self, address: str, action: str, head: int, overlap: Dict[str, int]) -> None:
+        address = address.lower()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO high_water (address, action, block_number) VALUES (?, ?, ?)",
+                (address, action, head),
+            )
+            self._conn.execute("DELETE FROM seen WHERE address = ? AND action = ?", (address, action))
+            self._conn.executemany(
+                "INSERT INTO seen (address, action, block_number, key) VALUES (?, ?, ?, ?)",
+                ((address, action, block_number, key) for key, block_number in overlap.items()),
+            )
+            self._conn.commit()
+
+    def sync(self, address: str, action: str) -> Iterator[BaseEvent]:
+        """
+        Yield the events for `address` that were not yielded by a previous run.
+
+        The high-water mark only moves once the iterator is exhausted, so an interrupted run is simply repeated.
+
+        Parameters:
+        address (str): The address to sync.
+        action (str): One of "txlist", "txlistinternal", "tokentx", "tokennfttx" or "token1155tx".
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Expected one of {ACTIONS}. Got: '{action}'")
+
+        head = self._client.get_block_number()
+        high_water = self.high_water(address, action)
+        start_block = 0 if high_water is None else max(0, high_water + 1 - self._reorg_depth)
+
+        seen = self._seen_keys(address, action)
+        # the next run starts over from here, so these are the keys it has to skip
+        overlap_start = max(0, head + 1 - self._reorg_depth)
+        overlap: Dict[str, int] = {}
+
+        events: Iterator[BaseEvent] = getattr(self._client, f"iter_{action}")(
+            address, start_block=start_block, end_block=head
+        )
+        for event in events:
+            key = event_key(event)
+            if event.block_number >= overlap_start:
+                overlap[key] = event.block_number
+            if key in seen:
+                continue
+            yield event
+
+        self._commit(address, action, head, overlap)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -2,6 +2,7 @@ from decimal import Decimal
 from typing import Dict, Optional
 
 from potpourri.python.ethereum.etherscan.base import BaseEvent, BaseEventDetailed
+from potpourri.python.ethereum.units import wei_to_eth, wei_to_gwei
 
 
 class Transaction(BaseEventDetailed):
@@ -32,11 +33,11 @@ class Transaction(BaseEventDetailed):
 
     @property
     def fee_gwei(self) -> Decimal:
-        return Decimal(self._gas_used * self._gas_price) / 10**9
+        return wei_to_gwei(self._gas_used * self._gas_price)
 
     @property
     def fee_eth(self) -> Decimal:
-        return Decimal(self._gas_used * self._gas_price) / 10**18
+        return wei_to_eth(self._gas_used * self._gas_price)
 
     @property
     def value_wei(self) -> int:
@@ -44,11 +45,11 @@ class Transaction(BaseEventDetailed):
 
     @property
     def value_gwei(self) -> Decimal:
-        return Decimal(self._value) / Decimal(10**9)
+        return wei_to_gwei(self._value)
 
     @property
     def value_eth(self) -> Decimal:
-        return Decimal(self._value) / Decimal(10**18)
+        return wei_to_eth(self._value)
 
 
 class InternalTransaction(BaseEvent):
@@ -77,8 +78,8 @@ class InternalTransaction(BaseEvent):
 
     @property
     def value_gwei(self) -> Decimal:
-        return Decimal(self._value) / Decimal(10**9)
+        return wei_to_gwei(self._value)
 
     @property
     def value_eth(self) -> Decimal:
-        return Decimal(self._value) / Decimal(10**18)
+        return wei_to_eth(self._value)
@@ -0,0 +1,115 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Mapping, Sequence, Tuple
+
+from potpourri.python.ethereum.block import BaseBlock, UncleBlock, get_base_reward
+from potpourri.python.ethereum.block_store import SECONDS_PER_DAY, BlockStore
+from potpourri.python.ethereum.constants import LONDON
+
+# (uncle block number, uncle miner)
+Uncle = Tuple[int, str]
+
+
+def uncle_reward_wei(uncle_number: int, nephew_number: int) -> int:
+    """The reward paid to the miner of an uncle included `nephew_number - uncle_number` blocks later."""
+    depth = uncle_number + 8 - nephew_number
+    if depth <= 0:
+        return 0
+    return get_base_reward(nephew_number) * depth // 8
+
+
+def nephew_reward_wei(nephew_number: int) -> int:
+    """The extra reward paid to the miner of a block for each uncle it includes."""
+    return get_base_reward(nephew_number) // 32
+
+
+class MinerRewards:
+    """Integer wei totals of what a miner was paid, and of the base fees burned in its blocks after LONDON."""
+
+    __slots__ = ("base_wei", "inclusion_wei", "uncle_wei", "burned_wei")
+
+    def __init__(self):
+        self.base_wei: int = 0
+        self.inclusion_wei: int = 0
+        self.uncle_wei: int = 0
+        self.burned_wei: int = 0
+
+    @property
+    def issued_wei(self) -> int:
+        return self.base_wei + self.inclusion_wei + self.uncle_wei
+
+    @property
+    def net_wei(self) -> int:
+        return self.issued_wei - self.burned_wei
+
+    def __repr__(self) -> str:
+        return (
+            f"MinerRewards(base_wei={self.base_wei}, inclusion_wei={self.inclusion_wei}, "
+            f"uncle_wei={self.uncle_wei}, burned_wei={self.burned_wei})"
+        )
+
+
+class MinerRevenueCalculator:
+    """
+    Accumulates per-miner and per-miner-per-day rewards over many blocks in exact integer wei.
+
+    Base and uncle-inclusion rewards go to the block's miner, uncle rewards to the uncle's miner, and the base fee
+    burned in a block after LONDON is counted against the block's miner. Everything is dated by the including block.
+    """
+
+    def __init__(self):
+        self._by_miner: Dict[str, MinerRewards] = defaultdict(MinerRewards)
+        self._by_miner_day: Dict[Tuple[str, int], MinerRewards] = defaultdict(MinerRewards)
+
+    def _rewards(self, miner: str, day: int) -> Tuple[MinerRewards, MinerRewards]:
+        return self._by_miner[miner], self._by_miner_day[(miner, day)]
+
+    def add_block(
+        self,
+        number: int,
+        timestamp: int,
+        miner: str,
+        gas_used: int,
+        base_fee_per_gas: int,
+        uncles: Sequence[Uncle] = (),
+    ) -> None:
+        day = timestamp - timestamp % SECONDS_PER_DAY
+        base = get_base_reward(number)
+        inclusion = len(uncles) * (base // 32)
+        burned = gas_used * base_fee_per_gas if number >= LONDON else 0
+
+        for rewards in self._rewards(miner.lower(), day):
+            rewards.base_wei += base
+            rewards.inclusion_wei += inclusion
+            rewards.burned_wei += burned
+
+        for uncle_number, uncle_miner in uncles:
+            reward = uncle_reward_wei(uncle_number, number)
+            for rewards in self._rewards(uncle_miner.lower(), day):
+                rewards.uncle_wei += reward
+
+    def add_blocks(self, blocks: Iterable[BaseBlock], uncles: Mapping[int, Sequence[UncleBlock]]) -> None:
+        """Add blocks, with the uncles each one included keyed by its number (e.g. from BlockFetcher.get_uncles)."""
+        for block in blocks:
+            block_uncles = [(uncle.number, uncle.miner) for uncle in uncles.get(block.number, ())]
+            self.add_block(
+                block.number, block.timestamp, block.miner, block.gas_used, block.base_fee_per_gas, block_uncles
+            )
+
+    def add_store(self, store: BlockStore, uncles: Mapping[int, Sequence[Uncle]]) -> None:
+        """Add every block of a BlockStore in one pass over its columns."""
+        miners = store.miners
+        for number, timestamp, miner_index, gas_used, base_fee_per_gas in zip(
+            store.number, store.timestamp, store.miner_index, store.gas_used, store.base_fee_per_gas
+        ):
+            self.add_block(number, timestamp, miners[miner_index], gas_used, base_fee_per_gas, uncles.get(number, ()))
+
+    def by_miner(self) -> Dict[str, MinerRewards]:
+        return dict(self._by_miner)
+
+    def by_miner_day(self) -> Dict[Tuple[str, datetime], MinerRewards]:
+        """Totals per miner and UTC day."""
+        return {
+            (miner, datetime.fromtimestamp(day, tz=timezone.utc)): rewards
+            for (miner, day), rewards in sorted(self._by_miner_day.items())
+        }
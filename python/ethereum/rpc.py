@@ -0,0 +1,127 @@
+import json
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from potpourri.python.ethereum.block import Block, UncleBlock
+from potpourri.python.utils import json_codec
+from potpourri.python.utils.http_session import HttpSession, get_default_session
+
+# (method, params)
+RpcCall = Tuple[str, List[Any]]
+
+
+class JsonRpcException(Exception):
+    """
+    An exception that is raised when a JSON-RPC node returns an error.
+    """
+
+    pass
+
+
+class JsonRpcClient:
+    """
+    A minimal Ethereum JSON-RPC client that can send many calls in one batch request.
+    """
+
+    def __init__(self, url: str, session: Optional[HttpSession] = None):
+        self._url: str = url
+        self._session: HttpSession = session or get_default_session()
+
+    def batch(self, calls: Sequence[RpcCall]) -> List[Any]:
+        """Send `calls` in one POST and return their results in the same order."""
+        if not calls:
+            return []
+
+        body = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params} for i, (method, params) in enumerate(calls)
+        ]
+        response = self._session.post(
+            self._url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        if response.status_code != 200:
+            raise JsonRpcException(f"[{self._url}] Status Code: {response.status_code}")
+
+        response_json = json_codec.loads(response.content)
+        if isinstance(response_json, dict):
+            # a node rejects a whole batch with a single error object
+            raise JsonRpcException(response_json.get("error", response_json))
+
+        # responses in a batch may come back in any order
+        results: List[Any] = [None] * len(calls)
+        for item in response_json:
+            if "error" in item:
+                raise JsonRpcException(f"{calls[item['id']][0]}: {item['error']}")
+            results[item["id"]] = item["result"]
+        return results
+
+    def call(self, method: str, params: List[Any]) -> Any:
+        return self.batch([(method, params)])[0]
+
+
+class BlockFetcher:
+    """
+    Fetches blocks as ethereum.block.Block objects through JSON-RPC batch requests.
+
+    Range scans keep up to `max_workers` batches in flight on a thread pool while the caller parses and consumes the
+    batches that have already arrived, so fetching and parsing overlap.
+    """
+
+    def __init__(self, client: JsonRpcClient, batch_size: int = 100, max_workers: int = 4):
+        """
+        Constructor for the BlockFetcher class.
+
+        Parameters:
+        client (JsonRpcClient): The client to send requests with.
+        batch_size (int, optional): The number of blocks requested per batch. Defaults to 100.
+        max_workers (int, optional): The number of batches in flight during a range scan. Defaults to 4.
+        """
+        self._client: JsonRpcClient = client
+        self._batch_size: int = batch_size
+        self._max_workers: int = max_workers
+
+    def get_block_number(self) -> int:
+        return int(self._client.call("eth_blockNumber", []), 16)
+
+    def _get_block_data(self, numbers: Sequence[int]) -> List[Dict[str, Any]]:
+        results = self._client.batch([("eth_getBlockByNumber", [hex(n), False]) for n in numbers])
+        for number, data in zip(numbers, results):
+            if data is None:
+                raise JsonRpcException(f"Block {number} not found")
+        return results
+
+    def get_blocks(self, numbers: Sequence[int]) -> List[Block]:
+        blocks: List[Block] = []
+        for i in range(0, len(numbers), self._batch_size):
+            blocks.extend(Block(data) for data in self._get_block_data(numbers[i : i + self._batch_size]))
+        return blocks
+
+    def get_block(self, number: int) -> Block:
+        return self.get_blocks([number])[0]
+
+    def iter_blocks(self, start_block: int, end_block: int) -> Iterator[Block]:
+        """Yield the blocks in [start_block, end_block] in order."""
+        batches: Iterable[range] = (
+            range(n, min(end_block, n + self._batch_size - 1) + 1)
+            for n in range(start_block, end_block + 1, self._batch_size)
+        )
+
+        with ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="rpc") as executor:
+            in_flight: Deque[Future] = deque()
+            for numbers in batches:
+                in_flight.append(executor.submit(self._get_block_data, numbers))
+                if len(in_flight) >= self._max_workers:
+                    for data in in_flight.popleft().result():
+                        yield Block(data)
+
+            while in_flight:
+                for data in in_flight.popleft().result():
+                    yield Block(data)
+
+    def get_uncles(self, block: Block) -> List[UncleBlock]:
+        """Fetch the uncles included in `block`."""
+        uncle_count = len(block.json.get("uncles", []))
+        calls: List[RpcCall] = [
+            ("eth_getUncleByBlockNumberAndIndex", [hex(block.number), hex(i)]) for i in range(uncle_count)
+        ]
+        return [UncleBlock(data, block.number, i) for i, data in enumerate(self._client.batch(calls))]
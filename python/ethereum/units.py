@@ -0,0 +1,24 @@
+from decimal import Decimal
+from functools import lru_cache
+
+GWEI_DECIMALS = 9
+ETH_DECIMALS = 18
+
+
+@lru_cache(maxsize=None)
+def scale_factor(decimals: int) -> Decimal:
+    """Return 10**decimals as a Decimal, built once per number of decimals."""
+    return Decimal(10**decimals)
+
+
+def to_decimal(amount: int, decimals: int) -> Decimal:
+    """Convert an integer amount of base units (wei, token units) into whole units."""
+    return Decimal(amount) / scale_factor(decimals)
+
+
+def wei_to_gwei(wei: int) -> Decimal:
+    return to_decimal(wei, GWEI_DECIMALS)
+
+
+def wei_to_eth(wei: int) -> Decimal:
+    return to_decimal(wei, ETH_DECIMALS)
@@ -3,17 +3,19 @@
 import os
 import time
 from argparse import ArgumentParser, Namespace
+from typing import Optional
 
-import requests
+from potpourri.python.utils.http_session import HttpSession, get_default_session
 
 
 class IfThisThenThatClient:
-    def __init__(self, ifttt_key):
+    def __init__(self, ifttt_key, session: Optional[HttpSession] = None):
         self._ifttt_key = ifttt_key
+        self._session: HttpSession = session or get_default_session()
 
     def send_event(self, event_name, event_data):
         url = f"https://maker.ifttt.com/trigger/{event_name}/with/key/{self._ifttt_key}"
-        return requests.post(url, json=event_data)
+        return self._session.post(url, json=event_data)
 
     def send_event_with_delay(self, event_name, event_data, delay_sec):
         time.sleep(delay_sec)
@@ -1,16 +1,32 @@
-import http.client
 import json
 import os
 import re
 import socket
 import sys
 import time
-from typing import Any, Dict, List, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar, Union
 
 from potpourri.python.openai.commit_message import CommitMessage
-from potpourri.python.openai.completion import (Completion, CompletionRequest,
-                                                CompletionResponse)
+from potpourri.python.openai.completion import Completion, CompletionRequest, CompletionResponse
+from potpourri.python.openai.completion_cache import CompletionCache
+from potpourri.python.openai.connection import HTTPSConnectionPool
+from potpourri.python.openai.diff_chunker import chunk_pieces, estimate_tokens, split_diff
 from potpourri.python.openai.parse.completion_parser import CompletionParser
+from potpourri.python.openai.parse.incremental_parser import IncrementalCompletionParser, ParseEvent
+from potpourri.python.openai.prompt_builder import PromptBuilder
+from potpourri.python.utils import json_codec
+
+T = TypeVar("T")
+
+# prompt plus completion tokens each model accepts
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+    "text-davinci-003": 4097,
+    "text-davinci-002": 4097,
+    "code-davinci-002": 8001,
+}
+DEFAULT_CONTEXT_TOKENS = 2049
 
 
 class OpenAIApiException(Exception):
@@ -37,23 +53,36 @@ class OpenAIBadCompletionException(OpenAIApiException):
     pass
 
 
+class OpenAIStreamInterruptedException(OpenAIApiException):
+    """
+    An exception that is raised when a streamed completion fails after some of it was already handed to the caller.
+    It is not retried, since a retry would hand the caller the same events again.
+    """
+
+    pass
+
+
 class OpenAIApiClient:
     """
     A simple wrapper around the OpenAI API
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, pool_size: int = 4, cache: Optional[CompletionCache] = None):
         """
         Constructor for the OpenApiClient class.
 
         Parameters:
         api_key (str, optional): The OpenAI API key to be used. If not provided, the value of the
             OPENAI_API_KEY environment variable will be used.
+        pool_size (int, optional): The number of keep-alive connections kept open to the API. Defaults to 4.
+        cache (CompletionCache, optional): A cache to answer repeated requests from. Defaults to no caching.
         """
         self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
         self.host: str = "api.openai.com"
-        self.conn = http.client.HTTPSConnection(host=self.host, port=443, timeout=30)
+        self.pool_size: int = pool_size
+        self.pool = HTTPSConnectionPool(host=self.host, port=443, timeout=30, max_size=pool_size)
         self.route_completion = "/v1/completions"
+        self.cache: Optional[CompletionCache] = cache
 
     def _create_headers(self) -> Dict[str, str]:
         """Create the headers for the request to the OpenAI API."""
@@ -65,12 +94,10 @@ class OpenAIApiClient:
     def _send_request(self, request: CompletionRequest, headers: Dict[str, str]) -> CompletionResponse:
         """Send a POST request to the OpenAI API and return the response data as a CompletionResponse object."""
         data: bytes = json.dumps(request.to_dict()).encode("utf-8")
-        self.conn.request("POST", self.route_completion, body=data, headers=headers)
-        response: http.client.HTTPResponse = self.conn.getresponse()
-        response_bytes: bytes = response.read()
+        _, response_bytes = self.pool.request("POST", self.route_completion, body=data, headers=headers)
         try:
             # {'id': 'cmpl-6ViayJ6ZhIl5HmAOpiA23oX4naca9', 'object': 'text_completion', 'created': 1673017612, 'model': 'text-davinci-003', 'choices': [{'text': 'response', 'index': 0, 'logprobs': None, 'finish_reason': 'length'}], 'usage': {'prompt_tokens': 3759, 'completion_tokens': 300, 'total_tokens': 4059}}
-            response_data: Dict[str, Any] = json.loads(response_bytes)
+            response_data: Dict[str, Any] = json_codec.loads(response_bytes)
             # {'error': {'message': 'That model is currently overloaded with other requests. You can retry your request, or contact us through our help center at help.openai.com if the error persists. (Please include the request ID 44fa8f95f731a58124b775d316c1b044 in your message.)', 'type': 'server_error', 'param': None, 'code': None}}
             if "error" in response_data:
                 print(
@@ -85,7 +112,7 @@ class OpenAIApiClient:
                 Completion(c["text"], c["index"], c["logprobs"], c["finish_reason"]) for c in response_data["choices"]
             ]
             return CompletionResponse(completions)
-        except json.JSONDecodeError:
+        except json_codec.DecodeError:
             print(
                 f"\033[01;31mError: Invalid JSON response from the API\033[0;0m",
                 file=sys.stderr,
@@ -110,6 +137,185 @@ class OpenAIApiClient:
             return False
         return True
 
+    def _with_retries(self, fn: Callable[[], T]) -> T:
+        """Call `fn`, retrying with exponential backoff on errors for up to TIMEOUT seconds."""
+        MAX_RETRIES = 3
+        TIMEOUT = 30
+
+        start = time.time()
+        delay = 1
+        for i in range(MAX_RETRIES):
+            if i > 0:
+                delay *= 2
+                time.sleep(delay)
+                print(f"Retrying...")
+
+            try:
+                return fn()
+            except OpenAIStreamInterruptedException:
+                raise
+            except socket.timeout as e:
+                if time.time() - start > TIMEOUT:
+                    raise e
+                else:
+                    print(f"\033[01;31mError: {e}\033[0;0m", file=sys.stderr)
+            except Exception as e:
+                if time.time() - start > TIMEOUT:
+                    raise e
+                else:
+                    print(f"\033[01;31mError: {e}\033[0;0m", file=sys.stderr)
+
+        raise OpenAIApiException("OpenAI API returned an invalid response")
+
+    def _get_cached(self, request: CompletionRequest) -> Optional[CompletionResponse]:
+        return self.cache.get(request) if self.cache is not None else None
+
+    def _put_cached(self, request: CompletionRequest, response: CompletionResponse) -> None:
+        if self.cache is not None:
+            self.cache.put(request, response)
+
+    def _get_completion_response(self, request: CompletionRequest, store: bool = True) -> CompletionResponse:
+        cached: Optional[CompletionResponse] = self._get_cached(request)
+        if cached is not None:
+            return cached
+
+        headers: Dict[str, str] = self._create_headers()
+        response: CompletionResponse = self._send_request(request, headers)
+        if not self._check_response(response):
+            raise OpenAIApiException("OpenAI API returned an invalid response")
+        if store:
+            self._put_cached(request, response)
+        return response
+
+    def _get_commit_message(self, request: CompletionRequest) -> CommitMessage:
+        # only cache completions that parse, so a retry does not get the same bad completion back
+        response: CompletionResponse = self._get_completion_response(request, store=False)
+        completion: Completion = response.completions[0]
+        with open(".prompt", "a") as f:
+            f.write(completion.text)
+
+        completion_parser = CompletionParser()
+        commit_message: CommitMessage = completion_parser.parse_commit_message(completion)
+        self._put_cached(request, response)
+        return commit_message
+
+    def _stream_request(self, request: CompletionRequest, headers: Dict[str, str]) -> Iterator[str]:
+        """
+        Send a streaming request and yield the completion text as it arrives. Closing the generator early closes
+        the connection, which stops the generation.
+        """
+        data: bytes = json.dumps(request.to_dict()).encode("utf-8")
+        with self.pool.open("POST", self.route_completion, body=data, headers=headers) as response:
+            if response.status != 200:
+                response_data: Dict[str, Any] = json_codec.loads(response.read())
+                message: str = response_data.get("error", {}).get("message", f"Status Code: {response.status}")
+                print(f"\033[01;31mError: {message}\033[0;0m", file=sys.stderr)
+                if message.startswith("That model is currently overloaded"):
+                    raise OpenAIModelOverloadException(message)
+                raise OpenAIApiException(message)
+
+            # server-sent events: "data: {...}" lines separated by blank lines, ending with "data: [DONE]"
+            for line in response:
+                line = line.strip()
+                if not line.startswith(b"data:"):
+                    continue
+                payload: bytes = line[len(b"data:") :].strip()
+                if payload == b"[DONE]":
+                    break
+                event: Dict[str, Any] = json_codec.loads(payload)
+                if "error" in event:
+                    raise OpenAIApiException(event["error"]["message"])
+                yield event["choices"][0]["text"]
+
+    def _stream_commit_message(
+        self, request: CompletionRequest, on_event: Optional[Callable[[ParseEvent], None]]
+    ) -> CommitMessage:
+        parser = IncrementalCompletionParser()
+        text = ""
+        emitted = False
+        cached: Optional[CompletionResponse] = self._get_cached(request)
+        if cached is not None:
+            stream: Iterator[str] = (completion.text for completion in cached.completions[:1])
+        else:
+            stream = self._stream_request(request, self._create_headers())
+        try:
+            with closing(stream) as deltas:
+                for delta in deltas:
+                    text += delta
+                    for event in parser.feed(delta):
+                        if on_event is not None:
+                            on_event(event)
+                        emitted = True
+                    # the commit message is complete, so stop the generation here
+                    if parser.done:
+                        break
+            for event in parser.close():
+                if on_event is not None:
+                    on_event(event)
+                emitted = True
+
+            with open(".prompt", "a") as f:
+                f.write(text)
+            commit_message: CommitMessage = parser.get_commit_message()
+        except Exception as e:
+            # retrying would hand the caller the events it already has a second time
+            if emitted:
+                raise OpenAIStreamInterruptedException(f"Stream failed after it was partly handed out: {e}") from e
+            raise
+
+        # the text is cut off after the commit message, which is all a later parse needs
+        self._put_cached(request, CompletionResponse([Completion(text, 0, None, "stop")]))
+        return commit_message
+
+    def stream_suggested_commit_message(
+        self,
+        prompt: str,
+        model: str = "text-davinci-003",
+        max_tokens: int = 300,
+        temperature: float = 0.9,
+        on_event: Optional[Callable[[ParseEvent], None]] = None,
+    ) -> CommitMessage:
+        """
+        Like get_suggested_commit_message, but streams the completion and parses it as it arrives. The generation is
+        cut off as soon as the ```text block holding the commit message closes.
+
+        Parameters:
+        prompt (str): The prompt to complete.
+        model (str, optional): The name of the model to use. Defaults to "text-davinci-003".
+        max_tokens (int, optional): The maximum number of tokens to generate. Defaults to 300.
+        temperature (float, optional): The temperature to use. Defaults to 0.9.
+        on_event (callable, optional): Called with each description line, subject line and commit message line
+            as soon as it is complete, e.g. to print it. Defaults to None.
+
+        Errors before the first event are retried. Once an event was handed to `on_event`, an error raises
+        OpenAIStreamInterruptedException instead, so the caller never sees the same line twice.
+
+        Returns:
+        CommitMessage: The parsed commit message.
+        """
+        request: CompletionRequest = CompletionRequest(prompt, model, max_tokens, temperature, stream=True)
+        return self._with_retries(lambda: self._stream_commit_message(request, on_event))
+
+    def get_completions(
+        self, requests: Sequence[CompletionRequest], max_workers: Optional[int] = None
+    ) -> List[CompletionResponse]:
+        """
+        Send many requests concurrently, each with its own retries.
+
+        Parameters:
+        requests (list(CompletionRequest)): The requests to send.
+        max_workers (int, optional): The number of requests in flight at once. Defaults to the connection pool size.
+
+        Returns:
+        list(CompletionResponse): The response to each request, in the order of the requests.
+        """
+
+        def get_completion_response(request: CompletionRequest) -> CompletionResponse:
+            return self._with_retries(lambda: self._get_completion_response(request))
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size, thread_name_prefix="openai") as executor:
+            return list(executor.map(get_completion_response, requests))
+
     def get_suggested_commit_message(
         self,
         prompt: str,
@@ -131,39 +337,110 @@ class OpenAIApiClient:
         Returns:
         str: The completion generated by the OpenAI API.
         """
-        MAX_RETRIES = 3
-        TIMEOUT = 30
+        request: CompletionRequest = CompletionRequest(prompt, model, max_tokens, temperature)
+        return self._with_retries(lambda: self._get_commit_message(request))
 
-        delay = 1
-        for i in range(MAX_RETRIES):
-            if i > 0:
-                delay *= 2
-                time.sleep(delay)
-                print(f"Retrying...")
+    def get_suggested_commit_messages(
+        self,
+        prompts: Sequence[str],
+        model: str = "text-davinci-003",
+        max_tokens: int = 300,
+        temperature: float = 0.9,
+        max_workers: Optional[int] = None,
+    ) -> List[CommitMessage]:
+        """
+        Get a commit message for each of many prompts concurrently, e.g. for every commit in a rebase series.
 
-            try:
-                request_data: CompletionRequest = CompletionRequest(prompt, model, max_tokens, temperature)
-                headers: Dict[str, str] = self._create_headers()
-                response: CompletionResponse = self._send_request(request_data, headers)
-                if not self._check_response(response):
-                    raise OpenAIApiException("OpenAI API returned an invalid response")
-                completion: Completion = response.completions[0]
-                with open(".prompt", "a") as f:
-                    f.write(completion.text)
-
-                completion_parser = CompletionParser()
-                commit_message: CommitMessage = completion_parser.parse_commit_message(completion)
-
-                return commit_message
-            except socket.timeout as e:
-                if time.time() > TIMEOUT:
-                    raise e
-                else:
-                    print(f"\033[01;31mError: {e}\033[0;0m", file=sys.stderr)
-            except Exception as e:
-                if time.time() > TIMEOUT:
-                    raise e
-                else:
-                    print(f"\033[01;31mError: {e}\033[0;0m", file=sys.stderr)
+        Parameters:
+        prompts (list(str)): The prompts to complete.
+        model (str, optional): The name of the model to use. Defaults to "text-davinci-003".
+        max_tokens (int, optional): The maximum number of tokens to generate. Defaults to 300.
+        temperature (float, optional): The temperature to use. Defaults to 0.9.
+        max_workers (int, optional): The number of requests in flight at once. Defaults to the connection pool size.
 
-        raise OpenAIApiException("OpenAI API returned an invalid response")
+        Returns:
+        list(CommitMessage): The commit message for each prompt, in the order of the prompts.
+        """
+
+        def get_commit_message(prompt: str) -> CommitMessage:
+            request: CompletionRequest = CompletionRequest(prompt, model, max_tokens, temperature)
+            return self._with_retries(lambda: self._get_commit_message(request))
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size, thread_name_prefix="openai") as executor:
+            return list(executor.map(get_commit_message, prompts))
+
+    def get_suggested_commit_message_for_diff(
+        self,
+        status_text: str,
+        diff_text: str,
+        model: str = "text-davinci-003",
+        max_tokens: int = 300,
+        temperature: float = 0.9,
+        summary_tokens: int = 150,
+        max_workers: Optional[int] = None,
+    ) -> CommitMessage:
+        """
+        Get a commit message for a diff of any size.
+
+        If the diff fits the model's context window it is sent in one prompt. Otherwise it is split per file and
+        hunk into chunks that fit, the chunks are summarized concurrently, and the commit message is written from
+        the summaries, summarizing the summaries again if they still do not fit. Raises OpenAIApiException if the
+        file list alone leaves no room for a summary, or if a pass fails to shrink the summaries.
+
+        Parameters:
+        status_text (str): The output of `git status -s`.
+        diff_text (str): The output of `git diff --cached`.
+        model (str, optional): The name of the model to use. Defaults to "text-davinci-003".
+        max_tokens (int, optional): The maximum number of tokens in the commit message completion. Defaults to 300.
+        temperature (float, optional): The temperature for the commit message. Summaries always use 0.
+            Defaults to 0.9.
+        summary_tokens (int, optional): The maximum number of tokens in each chunk summary. Defaults to 150.
+        max_workers (int, optional): The number of summaries requested at once. Defaults to the connection pool size.
+
+        Returns:
+        CommitMessage: The parsed commit message.
+        """
+        prompt_builder = PromptBuilder()
+        context_tokens: int = MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+        prompt: str = prompt_builder.get_prompt(model, status_text, diff_text)
+        if estimate_tokens(prompt) + max_tokens <= context_tokens:
+            return self.get_suggested_commit_message(prompt, model, max_tokens, temperature)
+
+        # the file list goes into every summary prompt and into the final one, which must still fit a summary
+        final_tokens: int = estimate_tokens(prompt_builder.get_prompt_from_summaries(model, status_text, []))
+        if final_tokens + summary_tokens + max_tokens > context_tokens:
+            raise OpenAIApiException(
+                f"Expected the file list to leave room for a summary in {context_tokens} tokens. "
+                f"Got: {final_tokens} tokens of prompt"
+            )
+        chunk_tokens: int = (
+            context_tokens - summary_tokens - estimate_tokens(prompt_builder.get_summary_prompt(status_text, ""))
+        )
+        if chunk_tokens <= 0:
+            raise OpenAIApiException(f"Expected the file list to fit in {context_tokens} tokens")
+
+        pieces: List[str] = split_diff(diff_text)
+        previous_chunks: Optional[int] = None
+        while True:
+            chunks: List[str] = chunk_pieces(pieces, chunk_tokens)
+            # every pass must shrink the summaries, or each one only pays for the same number of requests again
+            if previous_chunks is not None and len(chunks) >= previous_chunks:
+                raise OpenAIApiException(
+                    f"Expected fewer than {previous_chunks} chunks of summaries. Got: {len(chunks)}"
+                )
+            previous_chunks = len(chunks)
+
+            requests: List[CompletionRequest] = [
+                CompletionRequest(prompt_builder.get_summary_prompt(status_text, chunk), model, summary_tokens, 0)
+                for chunk in chunks
+            ]
+            pieces = [response.completions[0].text for response in self.get_completions(requests, max_workers)]
+
+            prompt = prompt_builder.get_prompt_from_summaries(model, status_text, pieces)
+            if estimate_tokens(prompt) + max_tokens <= context_tokens:
+                return self.get_suggested_commit_message(prompt, model, max_tokens, temperature)
+
+    def close(self) -> None:
+        """Close the connections kept open to the API."""
+        self.pool.close()
@@ -23,22 +23,30 @@ class Completion:
 
 
 class CompletionRequest:
-    """Stores the parameters used to generate a completion."""
+    """Stores the parameters used to generate a completion.
 
-    def __init__(self, prompt: str, model: str, max_tokens: int, temperature: float):
+    Attributes:
+        stream (bool): Ask the API to send the completion as server-sent events while it is generated.
+    """
+
+    def __init__(self, prompt: str, model: str, max_tokens: int, temperature: float, stream: bool = False):
         self.prompt = prompt
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.stream = stream
 
-    def to_dict(self) -> Dict[str, Union[float, int, str]]:
+    def to_dict(self) -> Dict[str, Union[bool, float, int, str]]:
         """Convert the completion request to a dictionary."""
-        return {
+        data: Dict[str, Union[bool, float, int, str]] = {
             "prompt": self.prompt,
             "model": self.model,
             "max_tokens": self.max_tokens,
             "temperature": self.temperature,
         }
+        if self.stream:
+            data["stream"] = True
+        return data
 
 
 class CompletionResponse:
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from potpourri.python.openai.completion import Completion, CompletionRequest, CompletionResponse
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+
+class CompletionCache:
+    """
+    An on-disk SQLite cache of completions, keyed by a hash of the request.
+
+    The key covers everything that shapes a completion (prompt, model, max_tokens, temperature) but not whether it
+    was streamed, so a streamed and a plain request share an entry. Entries expire after `ttl` seconds, and once the
+    cache outgrows `max_bytes` the least recently used ones are evicted. Requests with a temperature above zero are
+    sampled, so they are only cached when `cache_sampled` is set.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        cache_sampled: bool = False,
+    ):
+        """
+        Constructor for the CompletionCache class.
+
+        Parameters:
+        path (str): The SQLite database file.
+        ttl (float, optional): How long a completion is served from cache, in seconds. Defaults to 7 days.
+        max_bytes (int, optional): The size cap for cached completions. Defaults to 64 MiB.
+        cache_sampled (bool, optional): Also cache requests with a temperature above zero, trading fresh samples
+            for speed. Defaults to False.
+        """
+        self._ttl: float = ttl
+        self._max_bytes: int = max_bytes
+        self._cache_sampled: bool = cache_sampled
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+
+    @staticmethod
+    def key(request: CompletionRequest) -> str:
+        data = request.to_dict()
+        data.pop("stream", None)
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def is_cacheable(self, request: CompletionRequest) -> bool:
+        return request.temperature == 0 or self._cache_sampled
+
+    def get(self, request: CompletionRequest) -> Optional[CompletionResponse]:
+        """Return the cached response to `request`, if there is a fresh one."""
+        if not self.is_cacheable(request):
+            return None
+
+        key = self.key(request)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT data, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self._ttl:
+                self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+
+        completions = [Completion(c["text"], c["index"], c["logprobs"], c["finish_reason"]) for c in json.loads(row[0])]
+        return CompletionResponse(completions)
+
+    def put(self, request: CompletionRequest, response: CompletionResponse) -> None:
+        if not self.is_cacheable(request):
+            return
+
+        data = json.dumps(
+            [
+                {"text": c.text, "index": c.index, "logprobs": c.logprobs, "finish_reason": c.finish_reason}
+                for c in response.completions
+            ]
+        )
+        key = self.key(request)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, data, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now),
+            )
+            self._conn.commit()
+        self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions WHERE created_at < ?", (time.time() - self._ttl,))
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()
+            if total > self._max_bytes:
+                lru = self._conn.execute(
+                    "SELECT key, size FROM completions WHERE key != ? ORDER BY last_access", (keep,)
+                ).fetchall()
+                for key, size in lru:
+                    if total <= self._max_bytes:
+                        break
+                    self._conn.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    total -= size
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,133 @@
+import http.client
+import select
+import ssl
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+# errors raised when a kept-alive connection was closed by the server while it sat idle
+STALE_CONNECTION_ERRORS = (
+    http.client.BadStatusLine,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionAbortedError,
+    ConnectionResetError,
+    ssl.SSLEOFError,
+    ssl.SSLZeroReturnError,
+)
+
+
+class HTTPSConnectionPool:
+    """
+    A small pool of keep-alive HTTPS connections to a single host, safe to share between threads.
+
+    Idle connections are checked before reuse and dropped if the server has closed them or they have been idle
+    longer than `max_idle`. If a reused connection still turns out to be dead when the request is sent, the request
+    is replayed on the next connection, so callers only see errors a new connection also hits. Requests are never
+    pipelined: the completions endpoint is POST only, and a POST cannot be safely replayed once a pipelined
+    connection fails part way through.
+    """
+
+    def __init__(self, host: str, port: int = 443, timeout: float = 30.0, max_size: int = 4, max_idle: float = 60.0):
+        """
+        Constructor for the HTTPSConnectionPool class.
+
+        Parameters:
+        host (str): The host to connect to.
+        port (int, optional): The port to connect to. Defaults to 443.
+        timeout (float, optional): The socket timeout in seconds. Defaults to 30.
+        max_size (int, optional): The number of idle connections kept open. Defaults to 4.
+        max_idle (float, optional): How long a connection may sit idle before it is discarded, in seconds.
+            Defaults to 60.
+        """
+        self._host: str = host
+        self._port: int = port
+        self._timeout: float = timeout
+        self._max_size: int = max_size
+        self._max_idle: float = max_idle
+
+        self._lock = threading.Lock()
+        # (connection, idle since)
+        self._idle: Deque[Tuple[http.client.HTTPSConnection, float]] = deque()
+        self._closed: bool = False
+
+    def _is_stale(self, conn: http.client.HTTPSConnection, idle_since: float) -> bool:
+        if conn.sock is None or time.monotonic() - idle_since > self._max_idle:
+            return True
+        # an idle connection has nothing to read unless the server closed it
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+        return bool(readable)
+
+    def _acquire(self) -> Tuple[http.client.HTTPSConnection, bool]:
+        """Take the most recently used live connection, or open a new one. Returns the connection and whether it
+        was reused."""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, idle_since = self._idle.pop()
+            if not self._is_stale(conn, idle_since):
+                return conn, True
+            conn.close()
+
+        return http.client.HTTPSConnection(host=self._host, port=self._port, timeout=self._timeout), False
+
+    def _release(self, conn: http.client.HTTPSConnection) -> None:
+        with self._lock:
+            if not self._closed and len(self._idle) < self._max_size:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def _send(
+        self, method: str, url: str, body: Optional[bytes], headers: Dict[str, str]
+    ) -> Tuple[http.client.HTTPSConnection, http.client.HTTPResponse]:
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, url, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                conn.close()
+                # the server dropped the connection before answering, so the request was never processed
+                if not reused:
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+    @contextmanager
+    def open(
+        self, method: str, url: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Iterator[http.client.HTTPResponse]:
+        """
+        Send a request and yield the response. The connection goes back to the pool if the response was read to
+        the end and the server allows keep-alive, and is closed otherwise.
+        """
+        conn, response = self._send(method, url, body, headers or {})
+        try:
+            yield response
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.isclosed() and not response.will_close:
+            self._release(conn)
+        else:
+            conn.close()
+
+    def request(
+        self, method: str, url: str, body: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, bytes]:
+        """Send a request and return the response status and body."""
+        with self.open(method, url, body, headers) as response:
+            return response.status, response.read()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, deque()
+        for conn, _ in idle:
+            conn.close()
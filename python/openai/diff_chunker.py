@@ -0,0 +1,68 @@
+import re
+from typing import List
+
+# BPE tokenizers split identifiers into pieces of about four characters and give most punctuation its own token
+TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in `text` without a tokenizer. Leans high for code and diffs, so it is safe to
+    budget with.
+    """
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def split_diff(diff_text: str) -> List[str]:
+    """
+    Split a `git diff` into one piece per hunk. Each piece starts with the header of its file, so it can be read on
+    its own. Files without hunks (e.g. binary or mode changes) are kept as one piece.
+    """
+    pieces: List[str] = []
+    for file_diff in re.split(r"^(?=diff --git )", diff_text, flags=re.MULTILINE):
+        if not file_diff.strip():
+            continue
+        header, *hunks = re.split(r"^(?=@@ )", file_diff, flags=re.MULTILINE)
+        if not hunks:
+            pieces.append(header)
+        for hunk in hunks:
+            pieces.append(header + hunk)
+    return pieces
+
+
+def _split_lines(text: str, max_tokens: int) -> List[str]:
+    """Split a piece that is over budget on its own at line boundaries."""
+    parts: List[str] = []
+    part, part_tokens = "", 0
+    for line in text.splitlines(keepends=True):
+        line_tokens = estimate_tokens(line)
+        if part and part_tokens + line_tokens > max_tokens:
+            parts.append(part)
+            part, part_tokens = "", 0
+        part += line
+        part_tokens += line_tokens
+    if part:
+        parts.append(part)
+    return parts
+
+
+def chunk_pieces(pieces: List[str], max_tokens: int) -> List[str]:
+    """Pack consecutive pieces into as few chunks of at most `max_tokens` estimated tokens as possible."""
+    chunks: List[str] = []
+    chunk, chunk_tokens = "", 0
+    for piece in pieces:
+        for part in _split_lines(piece, max_tokens) if estimate_tokens(piece) > max_tokens else [piece]:
+            part_tokens = estimate_tokens(part)
+            if chunk and chunk_tokens + part_tokens > max_tokens:
+                chunks.append(chunk)
+                chunk, chunk_tokens = "", 0
+            chunk += part if part.endswith("\n") else part + "\n"
+            chunk_tokens += part_tokens
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def chunk_diff(diff_text: str, max_tokens: int) -> List[str]:
+    """Split a `git diff` per file and hunk into chunks of at most `max_tokens` estimated tokens."""
+    return chunk_pieces(split_diff(diff_text), max_tokens)
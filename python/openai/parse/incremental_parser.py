@@ -0,0 +1,97 @@
+import re
+from typing import List, Optional
+
+from potpourri.python.openai.commit_message import CommitMessage
+from potpourri.python.openai.parse.completion_parser import CompletionParser
+from potpourri.python.openai.parse.string_utils import wrap_text
+
+DESCRIPTION = "description"
+SUBJECT_LINE = "subject_line"
+COMMIT_MESSAGE = "commit_message"
+
+
+class ParseEvent:
+    """A piece of a completion recognised while it streams in.
+
+    Attributes:
+        section (str): DESCRIPTION, SUBJECT_LINE or COMMIT_MESSAGE.
+        text (str): A description line, a subject line, or a wrapped commit message line.
+    """
+
+    def __init__(self, section: str, text: str):
+        self.section = section
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"ParseEvent({self.section}, {self.text!r})"
+
+
+class IncrementalCompletionParser(CompletionParser):
+    """
+    Parses a completion as it streams in, using the same sections as CompletionParser.
+
+    Text is fed in arbitrary pieces and every complete line is classified as soon as it arrives. The parser is
+    `done` once the ``` block holding the suggested commit message closes, after which the rest of the completion
+    can be dropped.
+    """
+
+    def __init__(self):
+        self._buffer: str = ""
+        self._section: Optional[str] = None
+        self._fences: int = 0
+
+        self._description: List[str] = []
+        self._subject_lines: List[str] = []
+        self._commit_message: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return self._fences >= 2
+
+    def _parse_line(self, line: str) -> List[ParseEvent]:
+        if line.endswith("ubject lines:"):
+            self._section = "subject_lines"
+        elif line.startswith("Suggested commit message:"):
+            self._section = "commit_message"
+        elif line.startswith("- ") and self._section == "subject_lines":
+            self._subject_lines.append(line[2:])
+            return [ParseEvent(SUBJECT_LINE, line[2:])]
+        elif self._section == "commit_message":
+            if line.startswith("```"):
+                self._fences += 1
+                return []
+            wrapped = wrap_text(line, 72)
+            self._commit_message.extend(wrapped)
+            return [ParseEvent(COMMIT_MESSAGE, w) for w in wrapped]
+        else:
+            self._description.append(line)
+            return [ParseEvent(DESCRIPTION, line)]
+        return []
+
+    def feed(self, text: str) -> List[ParseEvent]:
+        """Add the next piece of the completion and return the events for the lines it completes."""
+        events: List[ParseEvent] = []
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            if self.done:
+                break
+            events.extend(self._parse_line(line))
+        return events
+
+    def close(self) -> List[ParseEvent]:
+        """Parse whatever is left after the last newline."""
+        line, self._buffer = self._buffer, ""
+        if not line or self.done:
+            return []
+        return self._parse_line(line)
+
+    def get_commit_message(self) -> CommitMessage:
+        description = "\n".join(self._description).strip()
+        commit_message = "\n".join(self._commit_message).strip()
+        commit_message = re.sub(r"\(commit message written by OpenAI text-davinci-003\)", "", commit_message)
+
+        # should start with "🤖"
+        self.validate(commit_message)
+
+        return CommitMessage(description, list(self._subject_lines), commit_message)
@@ -34,6 +34,6 @@ def wrap_text(lines: Union[str, List[str]], wrap_length: int) -> List[str]:
 
             # Update the line to be the remaining portion after the wrapped line
             line = line[space_index:]
-            # Add the final wrapped line to the list
-            wrapped_lines.append(line)
+        # Add the final wrapped line to the list
+        wrapped_lines.append(line)
     return wrapped_lines
@@ -1,3 +1,5 @@
+from typing import List
+
 PROMPT_WRITE_COMMIT_MESSAGE = """
 I want you to act as a technical writer for software engineers, your
 primary responsibility is to write clear and concise commit messages
@@ -88,6 +90,41 @@ Respond with:
 Detailed explanation:
 """
 
+# the same instructions, for a diff too large for one prompt that has been summarized piece by piece
+PROMPT_WRITE_COMMIT_MESSAGE_FROM_SUMMARIES = PROMPT_WRITE_COMMIT_MESSAGE.replace(
+    """Files diff:
+```diff
+// git diff --cached --no-color --no-ext-diff --unified=0 --no-prefix
+{diff_text}
+```
+""",
+    """Summary of the diff, part by part:
+```
+{summaries}
+```
+""",
+)
+
+PROMPT_SUMMARIZE_CHANGES = """
+I want you to act as a software engineer reviewing part of a large patch.
+
+Files changed in the whole patch:
+```
+// git status -s
+{status_text}
+```
+
+This part of the patch (a diff, or summaries of earlier parts):
+```
+{changes}
+```
+
+Summarize what this part changes and why, in a few short bullet points.
+Name the files and functions involved. Do not write a commit message.
+
+Summary:
+"""
+
 
 class PromptBuilder:
     def get_prompt(self, model: str, status_text: str, diff_text: str) -> str:
@@ -96,3 +133,18 @@ class PromptBuilder:
             status_text=status_text,
             diff_text=diff_text,
         )
+
+    def get_summary_prompt(self, status_text: str, changes: str) -> str:
+        """The prompt to summarize one chunk of a diff, or a chunk of earlier summaries."""
+        return PROMPT_SUMMARIZE_CHANGES.format(
+            status_text=status_text,
+            changes=changes,
+        )
+
+    def get_prompt_from_summaries(self, model: str, status_text: str, summaries: List[str]) -> str:
+        """The commit message prompt for a diff that was summarized in chunks."""
+        return PROMPT_WRITE_COMMIT_MESSAGE_FROM_SUMMARIES.format(
+            model=model,
+            status_text=status_text,
+            summaries="\n\n".join(summary.strip() for summary in summaries),
+        )
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+"""
+Compare per-request latency of bare requests.get against a pooled HttpSession, using a local stub HTTP server.
+"""
+
+import statistics
+import threading
+import time
+from argparse import ArgumentParser, Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+import requests
+from potpourri.python.utils.http_session import HttpSession
+
+STUB_BODY = b'{"status":"1","message":"OK","result":"40891626854930000000000"}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so the server honors keep-alive
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, which otherwise stalls on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(STUB_BODY)))
+        self.end_headers()
+        self.wfile.write(STUB_BODY)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def time_requests(get: Callable[[str], requests.Response], url: str, n: int) -> List[float]:
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        response = get(url)
+        response.content
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(name: str, latencies: List[float]) -> None:
+    mean_us = statistics.mean(latencies) * 1e6
+    p50_us = statistics.median(latencies) * 1e6
+    p99_us = sorted(latencies)[int(len(latencies) * 0.99) - 1] * 1e6
+    print(f"{name:<16} mean {mean_us:8.1f} us   p50 {p50_us:8.1f} us   p99 {p99_us:8.1f} us")
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser()
+    parser.add_argument("-n", type=int, default=2000, help="Number of requests per client")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args: Namespace = parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/api?module=account&action=balance"
+
+    try:
+        report("requests.get", time_requests(requests.get, url, args.n))
+        with HttpSession() as session:
+            report("HttpSession.get", time_requests(session.get, url, args.n))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import threading
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpSession:
+    """
+    A requests.Session backed by a keep-alive connection pool, so repeated calls to the same host reuse sockets
+    instead of paying DNS + TCP + TLS setup on every request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        timeout: Optional[float] = 30.0,
+        max_retries: int = 0,
+    ):
+        """
+        Constructor for the HttpSession class.
+
+        Parameters:
+        pool_connections (int, optional): The number of per-host pools to keep. Defaults to 10.
+        pool_maxsize (int, optional): The maximum number of connections kept open per host. Defaults to 10.
+        pool_block (bool, optional): Block when all connections to a host are busy instead of opening extra
+            connections that are thrown away afterwards. Defaults to False.
+        timeout (float, optional): The default timeout in seconds for every request. Defaults to 30.
+        max_retries (int, optional): The number of connection-level retries. Defaults to 0.
+        """
+        self._timeout = timeout
+        self._session = requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=max_retries,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self._timeout
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return self._session.get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return self._session.post(url, **kwargs)
+
+    def close(self) -> None:
+        self._session.close()
+
+    def __enter__(self) -> "HttpSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+_default_session: Optional[HttpSession] = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session() -> HttpSession:
+    """Return the process-wide session shared by clients that are not given one explicitly."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = HttpSession()
+        return _default_session
@@ -0,0 +1,34 @@
+"""
+JSON decoding through the fastest decoder installed: orjson, then msgspec, then the standard library.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+def _stdlib_loads(content: Union[bytes, str]) -> Any:
+    return json.loads(content)
+
+
+if orjson is not None:
+    DECODER = "orjson"
+    loads = orjson.loads
+    DecodeError = orjson.JSONDecodeError
+elif msgspec is not None:
+    DECODER = "msgspec"
+    loads = msgspec.json.Decoder().decode
+    DecodeError = msgspec.DecodeError
+else:
+    DECODER = "json"
+    loads = _stdlib_loads
+    DecodeError = json.JSONDecodeError